@@ -0,0 +1,1287 @@
+import sys
+import os
+import threading
+import resources_rc
+from PySide6 import QtGui
+from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout,
+                               QLabel, QLineEdit, QPushButton, QTextEdit, QProgressBar, QFileDialog, QDialog,
+                               QComboBox, QMessageBox, QFrame, QListView, QStyledItemDelegate, QTableView,
+                               QHeaderView, QStyle, QStyleOptionProgressBar)
+from PySide6.QtGui import QPixmap, QIcon, QAction, QPixmapCache, QPainter, QColor
+from PySide6.QtCore import (Qt, Signal, Slot, QTimer, QSize, QUrl, QRect, QEvent,
+                            QAbstractListModel, QAbstractTableModel, QModelIndex)
+from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PySide6.QtMultimediaWidgets import QVideoWidget
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+import downloader
+from PySide6.QtWebEngineWidgets import QWebEngineView
+from imageloader import get_image_loader, placeholder_pixmap
+from progress import format_bytes, format_eta, DONE, FAILED
+from scheduler import scheduler, PRIORITY_SINGLE, PRIORITY_PLAYLIST
+from backends import set_backend
+from downloader import (download_video, download_playlist,
+                          download_video_file, download_playlist_video,
+                          get_available_qualities, get_default_audio_folder, get_default_video_folder,
+                          returnUrlInfo, returnAudPlayUrlInfo, set_audio_download_folder, set_video_download_folder,
+                          SearchPager, set_audio_format)
+
+global Finished
+Finished = False
+
+class QualityDialog(QDialog):
+    def __init__(self, qualities, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Select Video Quality")
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 200); " +
+                           "color: #ffffff; " +
+                           "border: 2px solid #0ef; " +
+                           "border-radius: 10px;")
+        self.selected_quality = None
+        layout = QVBoxLayout()
+        label = QLabel("Select Quality:")
+        layout.addWidget(label)
+        self.combo = QComboBox()
+        self.combo.addItems(qualities)
+        layout.addWidget(self.combo)
+        button_layout = QHBoxLayout()
+        ok_btn = QPushButton("OK")
+        ok_btn.clicked.connect(self.accept)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(ok_btn)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+    def accept(self):
+        self.selected_quality = self.combo.currentText()
+        super().accept()
+
+    def get_selected_quality(self):
+        return self.selected_quality
+
+def format_duration(sec):
+    try:
+        sec = int(sec)
+    except (TypeError, ValueError):
+        sec = 0
+    hour, rest = divmod(sec, 3600)
+    minute, sec = divmod(rest, 60)
+    if hour:
+        return f"{hour:02d}:{minute:02d}:{sec:02d}"
+    return f"{minute:02d}:{sec:02d}"
+
+class SearchResultsModel(QAbstractListModel):
+    """
+    Search results fetched a page at a time as the view scrolls to the end.
+    Rows hold only the result dicts; thumbnails are loaded when a row is
+    painted and kept in QPixmapCache, so memory doesn't grow with the
+    number of results.
+    """
+    ResultRole = Qt.UserRole + 1
+    ThumbnailRole = Qt.UserRole + 2
+
+    # Every signal carries the search generation so pages of a search
+    # that was replaced by a newer one are dropped
+    page_loaded = Signal(int, list)
+    result_enriched = Signal(int, int, dict)
+    search_failed = Signal(int, str)
+    page_added = Signal(int, bool)
+
+    def __init__(self, page_size=20, parent=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.results = []
+        self.pager = None
+        self.generation = 0
+        self.fetching = False
+        self.pending_thumbnails = set()
+        self.enrich_executor = ThreadPoolExecutor(max_workers=4)
+        self.page_loaded.connect(self.add_page)
+        self.result_enriched.connect(self.enrich_result)
+        self.search_failed.connect(self.fetch_failed)
+
+    def search(self, query):
+        self.beginResetModel()
+        self.generation += 1
+        self.results = []
+        self.pager = SearchPager(query, self.page_size)
+        self.fetching = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.results)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.results):
+            return None
+        result = self.results[index.row()]
+        if role == Qt.DisplayRole:
+            return result.get('title', 'No Title')
+        if role == self.ResultRole:
+            return result
+        if role == self.ThumbnailRole:
+            return self.thumbnail(index.row())
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.pager is not None and not self.pager.exhausted and not self.fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.fetching = True
+        threading.Thread(target=self.fetch_thread, args=(self.pager, self.generation), daemon=True).start()
+
+    def fetch_thread(self, pager, generation):
+        try:
+            page = pager.next_page()
+        except Exception as e:
+            self.search_failed.emit(generation, str(e))
+            return
+        self.page_loaded.emit(generation, page)
+
+    @Slot(int, list)
+    def add_page(self, generation, page):
+        if generation != self.generation:
+            return
+        self.fetching = False
+        if page:
+            start = len(self.results)
+            self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+            self.results.extend(page)
+            self.endInsertRows()
+            for row, result in enumerate(page, start):
+                if not result.get('duration'):
+                    self.enrich_executor.submit(self.enrich_thread, generation, row, result.get('webpage_url'))
+        self.page_added.emit(len(self.results), not self.pager.exhausted)
+
+    @Slot(int, str)
+    def fetch_failed(self, generation, error):
+        if generation != self.generation:
+            return
+        self.fetching = False
+        self.pager.exhausted = True
+        print(f"Search error: {error}")
+        self.page_added.emit(len(self.results), False)
+
+    def enrich_thread(self, generation, row, url):
+        # Flat results sometimes lack a duration; fetch it in the background
+        if generation != self.generation or not url:
+            return
+        try:
+            info = returnUrlInfo(url)
+        except Exception as e:
+            print(f"Could not fetch details for {url}: {e}")
+            return
+        if info:
+            self.result_enriched.emit(generation, row,
+                                      {'duration': info.get('duration'), 'thumbnail': info.get('thumbnail')})
+
+    @Slot(int, int, dict)
+    def enrich_result(self, generation, row, info):
+        if generation != self.generation or row >= len(self.results):
+            return
+        result = self.results[row]
+        for key, value in info.items():
+            if value and not result.get(key):
+                result[key] = value
+        self.dataChanged.emit(self.index(row), self.index(row))
+
+    def thumbnail(self, row):
+        url = self.results[row].get('thumbnail')
+        if not url:
+            return None
+        key = f"search:{url}"
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None and key not in self.pending_thumbnails:
+            self.pending_thumbnails.add(key)
+            get_image_loader().load(url, partial(self.thumbnail_loaded, key, self.generation, row), size=(120, 90))
+        return pixmap
+
+    def thumbnail_loaded(self, key, generation, row, pixmap):
+        self.pending_thumbnails.discard(key)
+        QPixmapCache.insert(key, pixmap)
+        if generation == self.generation and row < len(self.results):
+            self.dataChanged.emit(self.index(row), self.index(row), [self.ThumbnailRole])
+
+class SearchResultDelegate(QStyledItemDelegate):
+    """
+    Paints a search result row (thumbnail, duration, title and the three
+    action buttons) instead of building widgets for it, and turns clicks
+    on the painted buttons into button_clicked(action, url).
+    """
+    button_clicked = Signal(str, str)
+
+    ROW_HEIGHT = 110
+    BUTTONS = (("audio", "Download Audio"), ("video", "Download Video"), ("watch", "Watch Video"))
+    BUTTON_WIDTH = 110
+    BUTTON_HEIGHT = 30
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def button_rects(self, rect):
+        rects = []
+        x = rect.right() - 5 - len(self.BUTTONS) * (self.BUTTON_WIDTH + 10) + 10
+        y = rect.top() + (rect.height() - self.BUTTON_HEIGHT) // 2
+        for action, _ in self.BUTTONS:
+            rects.append((action, QRect(x, y, self.BUTTON_WIDTH, self.BUTTON_HEIGHT)))
+            x += self.BUTTON_WIDTH + 10
+        return rects
+
+    def paint(self, painter, option, index):
+        result = index.data(SearchResultsModel.ResultRole)
+        if result is None:
+            return
+        rect = option.rect
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        thumb_rect = QRect(rect.left() + 5, rect.top() + 10, 120, 90)
+        pixmap = index.data(SearchResultsModel.ThumbnailRole)
+        painter.drawPixmap(thumb_rect, pixmap if pixmap is not None else placeholder_pixmap(120, 90))
+
+        font = painter.font()
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(option.palette.color(option.palette.ColorRole.Text))
+        time_rect = QRect(thumb_rect.right() + 10, rect.top(), 60, rect.height())
+        painter.drawText(time_rect, Qt.AlignVCenter | Qt.AlignLeft, format_duration(result.get('duration')))
+
+        buttons = self.button_rects(rect)
+        title_rect = QRect(time_rect.right() + 10, rect.top(), buttons[0][1].left() - time_rect.right() - 20,
+                           rect.height())
+        title = painter.fontMetrics().elidedText(result.get('title', 'No Title'), Qt.ElideRight, title_rect.width())
+        painter.drawText(title_rect, Qt.AlignVCenter | Qt.AlignLeft, title)
+
+        for (action, button_rect), (_, label) in zip(buttons, self.BUTTONS):
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor("#0ef"))
+            painter.drawRoundedRect(button_rect, 4, 4)
+            painter.setPen(QColor("#000000"))
+            painter.drawText(button_rect, Qt.AlignCenter, label)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            result = index.data(SearchResultsModel.ResultRole) or {}
+            for action, button_rect in self.button_rects(option.rect):
+                if button_rect.contains(event.position().toPoint()):
+                    self.button_clicked.emit(action, result.get("webpage_url") or result.get("url") or "")
+                    return True
+        return super().editorEvent(event, model, option, index)
+
+class PlaylistProgressModel(QAbstractTableModel):
+    """
+    One row per playlist entry with its state, bytes, speed and ETA, fed
+    with the coalesced snapshots of progress.ProgressAggregator. Only rows
+    that changed since the previous snapshot are repainted.
+    """
+    COLUMNS = ("#", "Title", "State", "Progress", "Speed", "ETA")
+    PROGRESS_COLUMN = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.keys = []
+        self.items = {}
+
+    def clear(self):
+        self.beginResetModel()
+        self.keys = []
+        self.items = {}
+        self.endResetModel()
+
+    def update_snapshot(self, snapshot):
+        items = snapshot['items']
+        keys = sorted(items)
+        if keys != self.keys:
+            self.beginResetModel()
+            self.keys = keys
+            self.items = items
+            self.endResetModel()
+            return
+        changed = [row for row, key in enumerate(keys) if items[key] != self.items.get(key)]
+        self.items = items
+        if changed:
+            self.dataChanged.emit(self.index(changed[0], 0), self.index(changed[-1], len(self.COLUMNS) - 1))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        key = self.keys[index.row()]
+        item = self.items[key]
+        column = index.column()
+        if role == Qt.UserRole and column == self.PROGRESS_COLUMN:
+            if item['state'] == DONE:
+                return 100
+            if item['total_bytes']:
+                return int(100 * item['downloaded_bytes'] / item['total_bytes'])
+            return 0
+        if role == Qt.ForegroundRole and column == 2 and item['state'] == FAILED:
+            return QColor("#ff6060")
+        if role != Qt.DisplayRole:
+            return None
+        if column == 0:
+            return str(key)
+        if column == 1:
+            return item['title'] or ""
+        if column == 2:
+            return item['state'] or ""
+        if column == 3:
+            if item['total_bytes']:
+                return f"{format_bytes(item['downloaded_bytes'])} / {format_bytes(item['total_bytes'])}"
+            return format_bytes(item['downloaded_bytes']) if item['downloaded_bytes'] else ""
+        if column == 4:
+            return f"{format_bytes(item['speed'])}/s" if item['speed'] else ""
+        if column == 5:
+            return format_eta(item['eta']) if item['speed'] else ""
+        return None
+
+class ProgressBarDelegate(QStyledItemDelegate):
+    # Paints a progress bar in the cell instead of placing a widget there
+    def paint(self, painter, option, index):
+        bar = QStyleOptionProgressBar()
+        bar.rect = option.rect.adjusted(2, 2, -2, -2)
+        bar.minimum = 0
+        bar.maximum = 100
+        bar.progress = index.data(Qt.UserRole) or 0
+        bar.text = index.data(Qt.DisplayRole) or ""
+        bar.textVisible = True
+        QApplication.style().drawControl(QStyle.CE_ProgressBar, bar, painter)
+
+def playlist_progress_view(model):
+    view = QTableView()
+    view.setModel(model)
+    view.setItemDelegateForColumn(PlaylistProgressModel.PROGRESS_COLUMN, ProgressBarDelegate(view))
+    view.verticalHeader().hide()
+    view.verticalHeader().setDefaultSectionSize(22)
+    view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+    view.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+    view.setSelectionMode(QTableView.NoSelection)
+    view.setFixedHeight(200)
+    view.setStyleSheet("QTableView { background-color: rgba(0, 0, 0, 100); border: 1px solid #303030; } "
+                       "QHeaderView::section { background-color: #303030; color: #ffffff; border: 0px; padding: 2px; }")
+    view.hide()
+    return view
+
+class JobQueueModel(QAbstractListModel):
+    # The scheduler's unfinished jobs, in the order they are served
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = []
+
+    def refresh(self):
+        jobs = scheduler.jobs()
+        if [job.id for job in jobs] != [job.id for job in self.jobs]:
+            self.beginResetModel()
+            self.jobs = jobs
+            self.endResetModel()
+        elif jobs:
+            self.dataChanged.emit(self.index(0), self.index(len(jobs) - 1))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.jobs)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        job = self.jobs[index.row()]
+        if role == Qt.UserRole:
+            return job
+        if role != Qt.DisplayRole:
+            return None
+        kind = "single" if job.priority == PRIORITY_SINGLE else "playlist"
+        state = "paused" if job.paused else job.state
+        return (f"{job.title}  ({kind}, {state}, "
+                f"{job.held['network']} download / {job.held['cpu']} ffmpeg slots)")
+
+def playlist_rate_text(snapshot):
+    states = snapshot['states']
+    return (f"{format_bytes(snapshot['speed'])}/s, {snapshot['items_per_minute']:.1f} items/min, "
+            f"{states[DONE]}/{len(snapshot['items'])} done, {states[FAILED]} failed")
+
+class VideoPlayerDialog(QDialog):
+    def __init__(self, url, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Watch Video")
+        self.setMinimumSize(800, 500)
+
+        layout = QVBoxLayout(self)
+
+        # Create YouTube embed HTML
+        video_id = self.get_youtube_id(url)
+        if video_id:
+            embed_html = f"""
+            <html>
+                <body style='margin:0'>
+                    <iframe width="100%" height="100%"
+                            src="https://www.youtube.com/embed/{video_id}"
+                            frameborder="0" allowfullscreen>
+                    </iframe>
+                </body>
+            </html>
+            """
+            # Create and add web view
+            web_view = QWebEngineView()
+            web_view.setHtml(embed_html)
+            layout.addWidget(web_view)
+
+        # Close button
+        close_btn = QPushButton("Close")
+        close_btn.setStyleSheet("background-color:#0ef; color:#000000; padding: 5px;")
+        close_btn.clicked.connect(self.close)
+        layout.addWidget(close_btn)
+
+    def get_youtube_id(self, url):
+        import re
+        patterns = [
+            r'youtube\.com/watch\?v=([^&]+)',
+            r'youtu\.be/([^?]+)'
+        ]
+        for pattern in patterns:
+            match = re.search(pattern, url)
+            if match:
+                return match.group(1)
+        return None
+
+class SearchTab(QWidget):
+    log_signal = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.init_ui()
+        self.log_signal.connect(self.log)
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        # Search bar
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search for videos on YouTube...")
+        search_layout.addWidget(self.search_input)
+        self.search_btn = QPushButton("Search")
+        self.search_btn.setStyleSheet("background-color:#0ef; color:#000000; padding: 5px;")
+        self.search_btn.clicked.connect(self.perform_search)
+        search_layout.addWidget(self.search_btn)
+        layout.addLayout(search_layout)
+
+        # Search results, fetched a page at a time while scrolling
+        self.results_model = SearchResultsModel(parent=self)
+        self.results_model.page_added.connect(self.page_added)
+        self.results_delegate = SearchResultDelegate(self)
+        self.results_delegate.button_clicked.connect(self.result_action)
+        self.results_view = QListView()
+        self.results_view.setModel(self.results_model)
+        self.results_view.setItemDelegate(self.results_delegate)
+        self.results_view.setUniformItemSizes(True)
+        self.results_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.results_view.setSelectionMode(QListView.NoSelection)
+        self.results_view.setStyleSheet("QListView { border: none; background-color: transparent; }")
+        layout.addWidget(self.results_view)
+
+        # Log text
+        self.log_text = QTextEdit()
+        self.log_text.setReadOnly(True)
+        self.log_text.setStyleSheet("background-color: transparent; border: 0px; padding: 5px;")
+        self.log_text.setFixedHeight(400)  # Limit log height
+        layout.addWidget(self.log_text)
+
+    def perform_search(self):
+        query = self.search_input.text().strip()
+        if not query:
+            QMessageBox.critical(self, "Error", "Please enter a search query")
+            return
+        self.log("Searching for: " + query)
+        self.results_model.search(query)
+
+    @Slot(int, bool)
+    def page_added(self, count, more):
+        if not count:
+            self.log("No results found.")
+        else:
+            self.log(f"Found {count} results." + ("" if more else " No more results."))
+
+    @Slot(str, str)
+    def result_action(self, action, url):
+        if action == "audio":
+            self.download_audio(url)
+        elif action == "video":
+            self.download_video(url)
+        elif action == "watch":
+            self.show_video(url)
+
+    def show_video(self, url):
+        # Open video in a dialog instead of embedding it in the main layout
+        dialog = VideoPlayerDialog(url, self)
+        dialog.exec()
+
+    def download_audio(self, url):
+        self.log("Queued audio download for: " + url)
+        # The output format is the one selected now, not when the job starts
+        scheduler.submit(partial(self.audio_download_thread, url, downloader.AUDIO_FORMAT), title="Audio: " + url,
+                         priority=PRIORITY_SINGLE)
+
+    def audio_download_thread(self, url, audio_format, job):
+        isFromSearch=True
+        success = downloader.download_video(url,isFromSearch, status_callback=self.log_signal.emit,
+                                            tag_callback=lambda path, ok: self.log_signal.emit(
+                                                ("Tagged: " if ok else "Tagging failed: ") + os.path.basename(path)),
+                                            job=job, audio_format=audio_format)
+        if success:
+            self.log_signal.emit("Audio download completed!")
+        else:
+            self.log_signal.emit("Audio download failed!")
+
+    def download_video(self, url):
+        self.log("Fetching available qualities for: " + url)
+        result = get_available_qualities(url)
+        if result:
+            qualities, info = result
+        else:
+            qualities, info = ([], {})
+        quality = None
+        if qualities:
+            dialog = QualityDialog(qualities, self)
+            if dialog.exec() == QDialog.Accepted:
+                quality = dialog.get_selected_quality()
+        if not quality:
+            quality = "best"
+        self.log("Selected quality: " + quality)
+        scheduler.submit(partial(self.video_download_thread, url, quality, info or None),
+                         title="Video: " + url, priority=PRIORITY_SINGLE)
+
+    def video_download_thread(self, url, quality, info, job):
+        isFromSearch=True
+        success = downloader.download_video_file(url,isFromSearch, quality=quality, status_callback=self.log_signal.emit,
+                                                 info=info, job=job)
+        if success:
+            self.log_signal.emit("Video download completed!")
+        else:
+            self.log_signal.emit("Video download failed!")
+
+    def log(self, message):
+        self.log_text.append(message)
+class DownloaderApp(QMainWindow):
+    audio_status_signal = Signal(str)
+    audiop_status_signal = Signal(str)
+    video_status_signal = Signal(str)
+    videop_status_signal = Signal(str)
+    audio_pool_signal = Signal(str)
+    audio_log_signal = Signal(str)
+    video_log_signal = Signal(str)
+    audio_preview_hide_signal = Signal()
+    video_preview_hide_signal = Signal()
+    audio_preview_signal = Signal(str, str)
+    audio_thumbnail_signal = Signal(str)
+    video_thumbnail_signal = Signal(str)
+    video_preview_signal = Signal(str, str, str, bool)
+    preview_error_signal = Signal(str)
+    download_error_signal = Signal(str, str)
+    video_pool_signal = Signal(str)
+    audio_snapshot_signal = Signal(object)
+    video_snapshot_signal = Signal(object)
+    audio_progress_finished_signal = Signal()
+    jobs_changed_signal = Signal()
+    video_progress_finished_signal = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.bg_pixmap = QPixmap("1.jpg")
+        self.setWindowTitle("Media Downloader")
+        self.setMinimumSize(800, 600)
+        self.showMaximized()
+        self.setStyleSheet("QWidget { background-color: transparent; color: #ffffff; } " +
+                           "QLineEdit { background-color: transparent; border: 1px solid #0ef; border-radius: 5px; padding: 2px; } " +
+                           "QTextEdit, QComboBox, QScrollArea { background-color: transparent; border: 0px; border-radius: 5px; padding: 5px; } " +
+                           "QTabWidget::pane { border: 0px; background: transparent; margin-top: 10px; } " +
+                           "QTabBar::tab { background: transparent; color: #ffffff; padding: 8px; border-top-left-radius: 5px; border-top-right-radius: 5px; } " +
+                           "QTabBar::tab:selected { background: #0ef; color: #000000; }")
+        # Failed downloads are reported by the engine from worker threads
+        downloader.add_error_listener(self.download_failed)
+        self.audio_download_job = None
+        self.video_download_job = None
+        # Created here so its results are delivered on the GUI thread
+        self.image_loader = get_image_loader()
+        self.setup_ui()
+        self.audio_status_signal.connect(self.update_audio_status)
+        self.audiop_status_signal.connect(self.update_audiop_status)
+        self.video_status_signal.connect(self.update_video_status)
+        self.videop_status_signal.connect(self.update_videop_status)
+        self.audio_pool_signal.connect(self.audio_pool_label.setText)
+        self.audio_log_signal.connect(self.log_audio)
+        self.video_log_signal.connect(self.log_video)
+        self.audio_preview_hide_signal.connect(self.aimage_label.hide)
+        self.video_preview_hide_signal.connect(self.vimage_label.hide)
+        self.audio_preview_signal.connect(self.show_audio_preview)
+        self.video_preview_signal.connect(self.show_video_preview)
+        self.audio_thumbnail_signal.connect(self.show_audio_thumbnail)
+        self.video_thumbnail_signal.connect(self.show_video_thumbnail)
+        self.preview_error_signal.connect(lambda message: QMessageBox.critical(self, "Preview Error", message))
+        self.download_error_signal.connect(lambda title, message: QMessageBox.critical(self, title, message))
+        self.video_pool_signal.connect(self.video_pool_label.setText)
+        self.audio_snapshot_signal.connect(self.update_audio_snapshot)
+        self.video_snapshot_signal.connect(self.update_video_snapshot)
+        self.audio_progress_finished_signal.connect(self.audio_progress_finished)
+        self.video_progress_finished_signal.connect(self.video_progress_finished)
+        # Scheduler listeners run on whatever thread changed the queue
+        self.jobs_changed_signal.connect(self.refresh_queue)
+        scheduler.listeners.append(self.jobs_changed_signal.emit)
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        if not self.bg_pixmap.isNull():
+            scaled = self.bg_pixmap.scaled(self.size(), Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+            x = (self.width() - scaled.width()) // 2
+            y = (self.height() - scaled.height()) // 2
+            painter.drawPixmap(x, y, scaled)
+        super().paintEvent(event)
+
+    def show_about(self):
+        QMessageBox.information(
+            self, "About",
+            "Media Downloader"
+            "with Preview, Cancel & History Features\n"
+            "Paste the link, one click download from internet\n\n"
+            "Basic Features:\n"
+            " *It can download Youtube video ,Youtube audio \n"
+            " *Search and download video/audio from youtube\n"
+            " *Thousands of supported platforms, social media apps like   facebook,instagram,tiktok etc and many more platforms like soundcloud,Deezer\n\n"
+            "Advanced Fearures:\n"
+            " *Downloading playlist support\n"
+            " *Downloading metadata with synced lyrics supported for single audio and   audio  playlist(useful for downloading yt music,soundcloud playlist etc..)\n"
+
+            " *User can select quality before downloading videos\n"
+            
+        )
+
+    def select_audio_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Audio Download Folder", get_default_audio_folder())
+        if folder:
+            set_audio_download_folder(folder)
+            self.audio_folder_label.setText("Download Folder: " + folder)
+
+    def select_video_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Video Download Folder", get_default_video_folder())
+        if folder:
+            set_video_download_folder(folder)
+            self.video_folder_label.setText("Download Folder: " + folder)
+
+    def choose_quality_dialog(self, qualities):
+        dialog = QualityDialog(qualities, self)
+        if dialog.exec() == QDialog.Accepted:
+            return dialog.get_selected_quality()
+        return None
+
+    def setup_ui(self):
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+        self.tabs = QTabWidget()
+        main_layout.addWidget(self.tabs)
+        self.audio_tab = QWidget()
+        self.tabs.addTab(self.audio_tab, "Audio")
+        self.setup_audio_tab(self.audio_tab)
+        self.video_tab = QWidget()
+        self.tabs.addTab(self.video_tab, "Video")
+        self.setup_video_tab(self.video_tab)
+        self.search_tab = SearchTab()
+        self.tabs.addTab(self.search_tab, "Search")
+        self.queue_tab = QWidget()
+        self.tabs.addTab(self.queue_tab, "Queue")
+        self.setup_queue_tab(self.queue_tab)
+        # Add About button as a corner widget on the top right
+        about_button = QPushButton("?")
+        about_button.setStyleSheet("background-color: transparent; color: #00FFFF; border: none;font-size:13pt;")
+        about_button.clicked.connect(self.show_about)
+        self.tabs.setCornerWidget(about_button, Qt.TopRightCorner)
+
+    def setup_audio_tab(self, tab):
+        audio_layout = QVBoxLayout(tab)
+        audio_input_widget = QWidget()
+        audio_input_layout = QVBoxLayout(audio_input_widget)
+        title_label = QLabel("Audio Download")
+        title_label.setStyleSheet("font-weight: bold; font-size: 11pt;")
+        audio_input_layout.addWidget(title_label)
+        url_widget = QWidget()
+        url_layout = QHBoxLayout(url_widget)
+        self.audio_url_entry = QLineEdit()
+        self.audio_url_entry.setPlaceholderText("Enter Media URL")
+        url_layout.addWidget(self.audio_url_entry)
+        clear_audio_btn = QPushButton("Clear")
+        clear_audio_btn.clicked.connect(lambda: self.audio_url_entry.clear())
+        clear_audio_btn.setStyleSheet("background-color:#0ef;color:#8B0000")
+        url_layout.addWidget(clear_audio_btn)
+        audio_input_layout.addWidget(url_widget)
+        btn_widget = QWidget()
+        btn_layout = QHBoxLayout(btn_widget)
+        preview_audio_btn = QPushButton("Preview")
+        preview_audio_btn.clicked.connect(self.preview_audio)
+        preview_audio_btn.setStyleSheet("background-color:#0ef;color:#000000")
+        btn_layout.addWidget(preview_audio_btn)
+        self.audio_download_btn = QPushButton("Download Audio")
+        self.audio_download_btn.clicked.connect(self.start_audio_download)
+        self.audio_download_btn.setStyleSheet("background-color:#0ef;color:#000000")
+        btn_layout.addWidget(self.audio_download_btn)
+        cancel_audio_btn = QPushButton("Cancel")
+        cancel_audio_btn.clicked.connect(lambda: self.cancel_audio_download())
+        cancel_audio_btn.setStyleSheet("background-color:#0ef;color:#8B0000")
+        btn_layout.addWidget(cancel_audio_btn)
+        self.audio_format_combo = QComboBox()
+        self.audio_format_combo.addItem("MP3 (320 kbps)", "mp3")
+        self.audio_format_combo.addItem("Original (no re-encode)", "native")
+        self.audio_format_combo.currentIndexChanged.connect(
+            lambda index: set_audio_format(self.audio_format_combo.itemData(index)))
+        btn_layout.addWidget(self.audio_format_combo)
+        self.audio_backend_combo = QComboBox()
+        self.audio_backend_combo.addItem("Tag on threads", "thread")
+        self.audio_backend_combo.addItem("Tag in worker processes", "process")
+        self.audio_backend_combo.currentIndexChanged.connect(
+            lambda index: set_backend(self.audio_backend_combo.itemData(index)))
+        btn_layout.addWidget(self.audio_backend_combo)
+        select_audio_btn = QPushButton("Select Folder")
+        select_audio_btn.clicked.connect(self.select_audio_folder)
+        select_audio_btn.setStyleSheet("background-color:#0ef;color:#000000")
+        btn_layout.addWidget(select_audio_btn)
+        audio_input_layout.addWidget(btn_widget)
+        audio_layout.addWidget(audio_input_widget)
+        audio_progress_widget = QWidget()
+        audio_progress_layout = QVBoxLayout(audio_progress_widget)
+        self.audio_progress = QProgressBar()
+        self.audio_progress.setMinimum(0)
+        self.audio_progress.setMaximum(0)
+        audio_progress_layout.addWidget(self.audio_progress)
+        self.audio_folder_label = QLabel("Download Folder: " + get_default_audio_folder())
+        audio_progress_layout.addWidget(self.audio_folder_label)
+        self.audiop_status_label = QLabel("")
+        self.audiop_status_label.setStyleSheet("font-size: 15pt; color: #ffffff;")
+        audio_progress_layout.addWidget(self.audiop_status_label)
+        self.audio_status_label = QLabel("")
+        self.audio_status_label.setStyleSheet("font-size: 15pt; color: #ffffff;")
+        audio_progress_layout.addWidget(self.audio_status_label)
+        self.audio_pool_label = QLabel("")
+        audio_progress_layout.addWidget(self.audio_pool_label)
+        self.audio_rate_label = QLabel("")
+        audio_progress_layout.addWidget(self.audio_rate_label)
+        self.audio_items_model = PlaylistProgressModel(self)
+        self.audio_items_view = playlist_progress_view(self.audio_items_model)
+        audio_progress_layout.addWidget(self.audio_items_view)
+        audio_layout.addWidget(audio_progress_widget)
+        self.audio_history_text = QTextEdit()
+        self.audio_history_text.setReadOnly(True)
+        self.audio_history_text.setFixedSize(680, 270)
+        self.audio_history_text.setStyleSheet("background-color: rgba(0, 0, 0, 100); border: 1px solid #303030; border-radius:10px;")
+        self.aimage_label = QLabel()
+        self.aimage_label.setAlignment(Qt.AlignCenter)
+        self.aimage_label.setFixedSize(480, 270)
+        self.aimage_label.setScaledContents(True)
+        self.aimage_label.hide()
+        self.audio_bottom_widget = QWidget()
+        self.audio_bottom_layout = QHBoxLayout(self.audio_bottom_widget)
+        self.audio_bottom_layout.addWidget(self.audio_history_text)
+        self.audio_bottom_layout.addSpacing(10)
+        self.audio_bottom_layout.addWidget(self.aimage_label)
+        self.audio_bottom_layout.setAlignment(Qt.AlignCenter | Qt.AlignTop)
+        audio_layout.addWidget(self.audio_bottom_widget)
+
+    def setup_video_tab(self, tab):
+        video_layout = QVBoxLayout(tab)
+        video_input_widget = QWidget()
+        video_input_layout = QVBoxLayout(video_input_widget)
+        video_title_label = QLabel("Video Download")
+        video_title_label.setStyleSheet("font-weight: bold; font-size: 11pt;")
+        video_input_layout.addWidget(video_title_label)
+        video_url_widget = QWidget()
+        video_url_layout = QHBoxLayout(video_url_widget)
+        self.video_url_entry = QLineEdit()
+        self.video_url_entry.setPlaceholderText("Enter Media URL")
+        video_url_layout.addWidget(self.video_url_entry)
+        clear_video_btn = QPushButton("Clear")
+        clear_video_btn.clicked.connect(lambda: self.video_url_entry.clear())
+        clear_video_btn.setStyleSheet("background-color:#0ef;color:#8B0000")
+        video_url_layout.addWidget(clear_video_btn)
+        video_input_layout.addWidget(video_url_widget)
+        quality_widget = QWidget()
+        quality_layout = QHBoxLayout(quality_widget)
+        quality_label = QLabel("Playlist Quality:")
+        quality_layout.addWidget(quality_label)
+        self.playlist_quality_combo = QComboBox()
+        self.playlist_quality_combo.addItems(["best", "2160", "1440", "1080", "720", "480", "360", "240"])
+        quality_layout.addWidget(self.playlist_quality_combo)
+        preview_video_btn = QPushButton("Preview")
+        preview_video_btn.setStyleSheet("background-color:#0ef;color:#000000")
+        preview_video_btn.clicked.connect(self.preview_video)
+        quality_layout.addWidget(preview_video_btn)
+        self.video_download_btn = QPushButton("Download Video")
+        self.video_download_btn.clicked.connect(self.start_video_download)
+        self.video_download_btn.setStyleSheet("background-color:#0ef;color:#000000")
+        quality_layout.addWidget(self.video_download_btn)
+        cancel_video_btn = QPushButton("Cancel")
+        cancel_video_btn.clicked.connect(lambda: self.cancel_video_download())
+        cancel_video_btn.setStyleSheet("background-color:#0ef;color:#8B0000")
+        quality_layout.addWidget(cancel_video_btn)
+        select_video_btn = QPushButton("Select Folder")
+        select_video_btn.clicked.connect(self.select_video_folder)
+        select_video_btn.setStyleSheet("background-color:#0ef;color:#000000")
+        quality_layout.addWidget(select_video_btn)
+        video_input_layout.addWidget(quality_widget)
+        video_layout.addWidget(video_input_widget)
+        video_progress_widget = QWidget()
+        video_progress_layout = QVBoxLayout(video_progress_widget)
+        self.video_progress = QProgressBar()
+        self.video_progress.setMinimum(0)
+        self.video_progress.setMaximum(0)
+        video_progress_layout.addWidget(self.video_progress)
+        self.video_folder_label = QLabel("Download Folder: " + get_default_video_folder())
+        video_progress_layout.addWidget(self.video_folder_label)
+        self.videop_status_label = QLabel("")
+        self.videop_status_label.setStyleSheet("font-size: 15pt; color: #ffffff;")
+        video_progress_layout.addWidget(self.videop_status_label)
+        self.video_status_label = QLabel("")
+        self.video_status_label.setStyleSheet("font-size: 15pt; color: #ffffff;")
+        video_progress_layout.addWidget(self.video_status_label)
+        self.video_pool_label = QLabel("")
+        video_progress_layout.addWidget(self.video_pool_label)
+        self.video_rate_label = QLabel("")
+        video_progress_layout.addWidget(self.video_rate_label)
+        self.video_items_model = PlaylistProgressModel(self)
+        self.video_items_view = playlist_progress_view(self.video_items_model)
+        video_progress_layout.addWidget(self.video_items_view)
+        video_layout.addWidget(video_progress_widget)
+        self.video_history_text = QTextEdit()
+        self.video_history_text.setReadOnly(True)
+        self.video_history_text.setFixedSize(680, 270)
+        self.video_history_text.setStyleSheet("background-color: rgba(0, 0, 0, 100); border: 2px solid #303030; border-radius:10px;")
+        self.vimage_label = QLabel()
+        self.vimage_label.setAlignment(Qt.AlignCenter)
+        self.vimage_label.setFixedSize(480, 270)
+        self.vimage_label.setScaledContents(True)
+        self.vimage_label.hide()
+        self.video_bottom_widget = QWidget()
+        self.video_bottom_layout = QHBoxLayout(self.video_bottom_widget)
+        self.video_bottom_layout.addWidget(self.video_history_text)
+        self.video_bottom_layout.addSpacing(10)
+        self.video_bottom_layout.addWidget(self.vimage_label)
+        self.video_bottom_layout.setAlignment(Qt.AlignCenter | Qt.AlignTop)
+        video_layout.addWidget(self.video_bottom_widget)
+
+    def setup_queue_tab(self, tab):
+        queue_layout = QVBoxLayout(tab)
+        title_label = QLabel("Download Queue")
+        title_label.setStyleSheet("font-weight: bold; font-size: 11pt;")
+        queue_layout.addWidget(title_label)
+        self.queue_model = JobQueueModel(self)
+        self.queue_view = QListView()
+        self.queue_view.setModel(self.queue_model)
+        self.queue_view.setStyleSheet("QListView { background-color: rgba(0, 0, 0, 100); border: 1px solid #303030; } "
+                                      "QListView::item:selected { background-color: #0ef; color: #000000; }")
+        queue_layout.addWidget(self.queue_view)
+        btn_widget = QWidget()
+        btn_layout = QHBoxLayout(btn_widget)
+        for text, action in (("Pause", lambda job: job.pause()), ("Resume", lambda job: job.resume()),
+                             ("Move Up", lambda job: self.move_job(job, -1)),
+                             ("Move Down", lambda job: self.move_job(job, 1)), ("Cancel", lambda job: job.cancel())):
+            button = QPushButton(text)
+            button.setStyleSheet("background-color:#0ef;color:#000000")
+            button.clicked.connect(partial(self.queue_action, action))
+            btn_layout.addWidget(button)
+        queue_layout.addWidget(btn_widget)
+        self.queue_usage_label = QLabel("")
+        queue_layout.addWidget(self.queue_usage_label)
+        # Slot usage changes without the job list changing
+        self.queue_timer = QTimer(self)
+        self.queue_timer.timeout.connect(self.refresh_queue)
+        self.queue_timer.start(1000)
+        self.refresh_queue()
+
+    @Slot()
+    def refresh_queue(self):
+        selected = self.selected_job()
+        self.queue_model.refresh()
+        if selected in self.queue_model.jobs:
+            self.queue_view.setCurrentIndex(self.queue_model.index(self.queue_model.jobs.index(selected)))
+        usage = scheduler.usage()
+        self.queue_usage_label.setText("Download slots: {}/{}, ffmpeg slots: {}/{}".format(
+            *usage['network'], *usage['cpu']))
+
+    def selected_job(self):
+        index = self.queue_view.currentIndex()
+        return index.data(Qt.UserRole) if index.isValid() else None
+
+    def queue_action(self, action):
+        job = self.selected_job()
+        if job is not None:
+            action(job)
+            self.refresh_queue()
+
+    def move_job(self, job, offset):
+        # Up/down among the jobs of the same priority
+        peers = [other for other in scheduler.jobs() if other.priority == job.priority]
+        if job in peers:
+            scheduler.move(job, peers.index(job) + offset)
+
+    def log_audio(self, message):
+        self.audio_history_text.append(message)
+
+    def log_video(self, message):
+        self.video_history_text.append(message)
+
+    def preview_audio(self):
+        url = self.audio_url_entry.text().strip()
+        if not url:
+            QMessageBox.critical(self, "Error", "Please enter a URL to preview audio info")
+            return
+        self.aimage_label.setPixmap(placeholder_pixmap(480, 270))
+        self.aimage_label.show()
+        threading.Thread(target=self.audio_preview_thread, args=(url,), daemon=True).start()
+
+    def audio_preview_thread(self, url):
+        try:
+            if "playlist" in url:
+                # The thumbnail may arrive later through audio_thumbnail_signal
+                info = returnAudPlayUrlInfo(url, thumbnail_callback=self.audio_thumbnail_signal.emit)
+                title = info[0]
+                thumbnail_url = info[2]
+                self.audiop_status_signal.emit("Playlist: " + title)
+                self.audio_status_signal.emit("Total Files: " + str(info[1]))
+            else:
+                info = returnUrlInfo(url)
+                title = info.get('title', 'Unknown Title')
+                thumbnail_url = info.get('thumbnail', '')
+            self.audio_preview_signal.emit(title, thumbnail_url or '')
+            if not thumbnail_url and "playlist" not in url:
+                self.audio_thumbnail_signal.emit('')
+        except Exception as e:
+            self.preview_error_signal.emit(str(e))
+
+    @Slot(str, str)
+    def show_audio_preview(self, title, thumbnail_url):
+        self.log_audio("Preview: " + title)
+        if thumbnail_url:
+            self.image_loader.load(thumbnail_url, self.set_audio_image)
+
+    @Slot(str)
+    def show_audio_thumbnail(self, thumbnail_url):
+        if thumbnail_url:
+            self.image_loader.load(thumbnail_url, self.set_audio_image)
+        else:
+            self.aimage_label.hide()
+
+    def preview_video(self):
+        url = self.video_url_entry.text().strip()
+        if not url:
+            QMessageBox.critical(self, "Error", "Please enter a URL to preview video info")
+            return
+        if not (url.startswith("http://") or url.startswith("https://")):
+            QMessageBox.critical(self, "Error", "Please enter a valid URL to preview video info")
+            return
+        self.vimage_label.setPixmap(placeholder_pixmap(480, 270))
+        self.vimage_label.show()
+        threading.Thread(target=self.video_preview_thread, args=(url,), daemon=True).start()
+
+    def video_preview_thread(self, url):
+        try:
+            is_playlist = "playlist" in url.lower()
+            if is_playlist:
+                info = returnAudPlayUrlInfo(url, thumbnail_callback=self.video_thumbnail_signal.emit)
+                title = info[0]
+                thumbnail_url = info[2]
+                self.videop_status_signal.emit("Playlist: " + title)
+                self.video_status_signal.emit("Total Files: " + str(info[1]))
+            else:
+                info = returnUrlInfo(url)
+                title = info.get('title', 'Unknown Title')
+                thumbnail_url = info.get('thumbnail', '')
+            self.video_preview_signal.emit(title, thumbnail_url or '', url, is_playlist)
+        except Exception as e:
+            self.preview_error_signal.emit(str(e))
+
+    @Slot(str)
+    def show_video_thumbnail(self, thumbnail_url):
+        if thumbnail_url:
+            self.image_loader.load(thumbnail_url, self.set_video_image)
+        else:
+            self.vimage_label.hide()
+
+    @Slot(str, str, str, bool)
+    def show_video_preview(self, title, thumbnail_url, url, is_playlist):
+        self.log_video("Preview: " + title)
+        if thumbnail_url:
+            self.image_loader.load(thumbnail_url, self.set_video_image)
+        elif not is_playlist:
+            self.vimage_label.hide()
+        if not is_playlist:
+            self.video_status_label.setText(title)
+            dialog = VideoPlayerDialog(url, self)
+            dialog.exec()
+
+    def download_failed(self, result):
+        # Error listener, called on the download thread; cancelling isn't an error worth a dialog
+        if not result.cancelled:
+            self.download_error_signal.emit(result.error_title, result.message)
+
+    def cancel_audio_download(self):
+        # Cancels only this tab's latest job; search downloads and queued jobs keep going
+        try:
+            if self.audio_download_job is not None and not self.audio_download_job.done():
+                self.audio_download_job.cancel()
+                self.log_audio("Cancelling Audio Download.")
+                if self.audio_download_job.done():
+                    # It was still queued and never started
+                    self.audio_status_label.setText("Download Cancelled")
+                    self.audio_progress_finished()
+        except Exception as e:
+            QMessageBox.critical(self, "Cancel Error", str(e))
+
+    def cancel_video_download(self):
+        try:
+            if self.video_download_job is not None and not self.video_download_job.done():
+                self.video_download_job.cancel()
+                self.log_video("Cancelling Video Download.")
+                if self.video_download_job.done():
+                    self.video_status_label.setText("Download Cancelled")
+                    self.video_progress_finished()
+        except Exception as e:
+            QMessageBox.critical(self, "Cancel Error", str(e))
+
+    def start_audio_download(self):
+        url = self.audio_url_entry.text().strip()
+        if not url:
+            QMessageBox.critical(self, "Error", "Please enter a URL for audio")
+            return
+        self.audio_progress.setMaximum(0)
+        self.audio_status_label.setText("Starting download...")
+        self.log_audio("Download started.")
+        self.aimage_label.clear()
+        self.audio_items_model.clear()
+        self.audio_rate_label.setText("")
+        self.audio_items_view.setVisible("playlist" in url)
+        # The output format is the one selected now, not when the job starts
+        audio_format = downloader.AUDIO_FORMAT
+        def audio_task(job):
+            try:
+                if "playlist" in url:
+                    success = downloader.download_playlist(url, status_callback=lambda text: self.audio_status_signal.emit(text),
+                                                            progress_callback_audio=self.playlist_audio_track,
+                                                            tag_callback=self.audio_tagged,
+                                                            snapshot_callback=self.audio_snapshot_signal.emit,
+                                                            pool_callback=lambda workers, mbps: self.audio_pool_signal.emit(
+                                                                f"Parallel downloads: {workers} ({mbps:.2f} MB/s)"),
+                                                            job=job, audio_format=audio_format)
+                else:
+                    info = returnUrlInfo(url)
+                    if info:
+                        status_text = "Downloading " + info.get('title','unknown title')
+                        self.audio_status_signal.emit(status_text)
+                        thumbnail_url = info.get('thumbnail', '')
+                        if thumbnail_url:
+                            self.image_loader.load(thumbnail_url, self.set_audio_image)
+                    success = downloader.download_video(url, status_callback=lambda text: self.audio_status_signal.emit(text),
+                                                        tag_callback=self.audio_tagged, job=job,
+                                                        audio_format=audio_format)
+                if success:
+                    
+                    self.audio_log_signal.emit("Audio download completed!")
+                    for entry, error in success.failures:
+                        self.audio_log_signal.emit(f"Skipped {entry}: {error}")
+                else:
+                    self.audio_status_signal.emit("Download Cancelled" if success.cancelled else "Download Failed")
+                    self.audiop_status_signal.emit("")
+                    
+                    if not Finished:
+                        self.audio_preview_hide_signal.emit()
+                        self.audio_log_signal.emit("Audio download failed!")
+                    if Finished:
+                        self.audio_status_signal.emit("Download Completed")
+                        self.audiop_status_signal.emit("")
+
+            except Exception as e:
+                self.audio_status_signal.emit("Error: " + str(e))
+                self.audio_log_signal.emit("Error: " + str(e))
+            finally:
+                self.audio_progress_finished_signal.emit()
+        # Started by the scheduler, single tracks ahead of playlists
+        self.audio_download_job = scheduler.submit(
+            audio_task, title="Audio: " + url,
+            priority=PRIORITY_PLAYLIST if "playlist" in url else PRIORITY_SINGLE)
+
+    @Slot(str)
+    def update_audio_status(self, text):
+        self.audio_status_label.setText(text)
+
+    @Slot(str)
+    def update_audiop_status(self, text):
+        self.audiop_status_label.setText(text)
+
+    @Slot(QPixmap)
+    def set_audio_image(self, pixmap):
+        self.aimage_label.setPixmap(pixmap)
+        self.aimage_label.show()
+
+    @Slot(object)
+    def update_audio_snapshot(self, snapshot):
+        self.audio_items_model.update_snapshot(snapshot)
+        self.audio_rate_label.setText(playlist_rate_text(snapshot))
+        self.audio_progress.setMaximum(len(snapshot['items']))
+        self.audio_progress.setValue(snapshot['states'][DONE] + snapshot['states'][FAILED])
+
+    @Slot()
+    def audio_progress_finished(self):
+        self.audio_progress.setMaximum(1)
+        self.audio_progress.setValue(1)
+
+    def audio_tagged(self, file_path, ok):
+        # Called from the tagging service thread
+        self.audio_log_signal.emit(("Tagged: " if ok else "Tagging failed: ") + os.path.basename(file_path))
+
+    def playlist_audio_track(self, title, thumbnail, index, total, playlist_title):
+        pstatus_text = "Playlist " + playlist_title + ": Total Files " + str(total)
+        self.audiop_status_signal.emit(pstatus_text)
+        status_text = "Downloading " + str(index) + "/" + str(total) + ": " + title
+        self.audio_status_signal.emit(status_text)
+        self.audio_log_signal.emit("Downloading: " + title + " (" + str(index) + "/" + str(total) + ")")
+        global Finished 
+        print(index/total)
+        if index>=total:
+          Finished = True
+          print("yes u did it")
+        else:
+          Finished = False
+        if thumbnail:
+            self.image_loader.load(thumbnail, self.set_audio_image)
+
+    def start_video_download(self):
+        url = self.video_url_entry.text().strip()
+        if not url:
+            QMessageBox.critical(self, "Error", "Please enter a URL for video")
+            return
+        if not (url.startswith("http://") or url.startswith("https://")):
+            self.video_status_label.setText("Please Enter a valid URL or search from search bar.")
+            self.videop_status_label.setText("")
+            return
+        self.vimage_label.clear()
+        self.video_items_model.clear()
+        self.video_rate_label.setText("")
+        self.video_items_view.setVisible("playlist" in url.lower())
+        self.video_progress.setMaximum(0)
+        self.video_status_label.setText("Starting download...")
+        self.log_video("Download started.")
+        if "playlist" in url.lower():
+            def video_task_playlist(job):
+                try:
+                    quality = self.playlist_quality_combo.currentText()
+                    success = downloader.download_playlist_video(url, quality=quality,
+                                                                 status_callback=lambda text: self.video_status_signal.emit(text),
+                                                                 progress_callback=self.update_download_progress,
+                                                                 snapshot_callback=self.video_snapshot_signal.emit,
+                                                                 pool_callback=lambda workers, mbps: self.video_pool_signal.emit(
+                                                                     f"Parallel downloads: {workers} ({mbps:.2f} MB/s)"),
+                                                                 job=job)
+                    if success:
+                        self.video_log_signal.emit("Video download completed!")
+                    else:
+                        self.video_status_signal.emit("Download Cancelled" if success.cancelled else "Download Failed")
+                        self.videop_status_signal.emit("")
+                        self.video_log_signal.emit("Video download failed!")
+                except Exception as e:
+                    self.video_status_signal.emit("Error: " + str(e))
+                    self.video_log_signal.emit("Error: " + str(e))
+                finally:
+                    self.video_progress_finished_signal.emit()
+            self.video_download_job = scheduler.submit(video_task_playlist, title="Video playlist: " + url,
+                                                       priority=PRIORITY_PLAYLIST)
+        else:
+            result = downloader.get_available_qualities(url)
+            if result:
+                qualities, info = result
+            else:
+                qualities, info = ([], {})
+            quality = None
+            if qualities:
+                quality = self.choose_quality_dialog(qualities)
+            if not quality:
+                quality = "best"
+            self.log_video("Selected quality: " + quality)
+            def video_task_single(quality, job):
+                try:
+                    status_text = "Downloading " + info.get('title','unknown title')
+                    self.video_status_signal.emit(status_text)
+                    thumbnail_url = info.get('thumbnail', '')
+                    if thumbnail_url:
+                        self.image_loader.load(thumbnail_url, self.set_video_image)
+                    # Downloads from the info the quality probe already extracted
+                    success = downloader.download_video_file(url, quality=quality,
+                                                             status_callback=lambda text: self.video_status_signal.emit(text),
+                                                             info=info or None, job=job)
+                    if success:
+                        self.video_log_signal.emit("Video download completed!")
+                    elif success.cancelled:
+                        self.video_status_signal.emit("Download Cancelled")
+                        self.video_log_signal.emit("Video download cancelled.")
+                    else:
+                        self.video_status_signal.emit("Cannot Download")
+                        self.video_preview_hide_signal.emit()
+                        self.video_log_signal.emit("Video download failed!")
+                except Exception as e:
+                    self.video_status_signal.emit("Error: " + str(e))
+                    self.video_log_signal.emit("Error: " + str(e))
+                finally:
+                    self.video_progress_finished_signal.emit()
+            self.video_download_job = scheduler.submit(partial(video_task_single, quality), title="Video: " + url,
+                                                       priority=PRIORITY_SINGLE)
+
+    @Slot(str)
+    def update_video_status(self, text):
+        self.video_status_label.setText(text)
+
+    @Slot(str)
+    def update_videop_status(self, text):
+        self.videop_status_label.setText(text)
+
+    @Slot(QPixmap)
+    def set_video_image(self, pixmap):
+        self.vimage_label.setPixmap(pixmap)
+        self.vimage_label.show()
+
+    @Slot(object)
+    def update_video_snapshot(self, snapshot):
+        self.video_items_model.update_snapshot(snapshot)
+        self.video_rate_label.setText(playlist_rate_text(snapshot))
+        self.video_progress.setMaximum(len(snapshot['items']))
+        self.video_progress.setValue(snapshot['states'][DONE] + snapshot['states'][FAILED])
+
+    @Slot()
+    def video_progress_finished(self):
+        self.video_progress.setMaximum(1)
+        self.video_progress.setValue(1)
+
+    def update_download_progress(self, title, thumbnail, index, total, playlist_title):
+        pstatus_text = "Playlist " + playlist_title + ": Total Files " + str(total)
+        self.videop_status_signal.emit(pstatus_text)
+        status_text = "Downloading " + str(index) + "/" + str(total) + ": " + title
+        self.video_status_signal.emit(status_text)
+        self.video_log_signal.emit("Downloading: " + title + " (" + str(index) + "/" + str(total) + ")")
+        if thumbnail:
+            self.image_loader.load(thumbnail, self.set_video_image)
+
+def run():
+    # Started by main.py, which keeps Qt out of the process backend's workers
+    app = QApplication(sys.argv)
+    app.setWindowIcon(QtGui.QIcon(":/icons/faviconc5.ico"))
+    window = DownloaderApp()
+    window.show()
+    sys.exit(app.exec())
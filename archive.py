@@ -0,0 +1,98 @@
+import os
+import time
+import shutil
+import sqlite3
+import threading
+from cache import get_cache_folder
+
+
+class MediaArchive:
+    """
+    Index of every file we downloaded, across all audio and video folders,
+    keyed by extractor + video id and the output kind and format. Before a
+    download starts the index is checked. A file we already have is
+    hard-linked into the new folder (copied where links aren't possible,
+    e.g. across drives) instead of being downloaded again.
+    Entries whose file was deleted or moved are dropped on lookup.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_cache_folder(), "archive.sqlite3")
+        self.reused = 0
+        self.saved_bytes = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._db = None
+        try:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS media ("
+                "extractor TEXT, id TEXT, kind TEXT, format TEXT, path TEXT, size INTEGER, seconds REAL, "
+                "tagged INTEGER DEFAULT 0, updated REAL, PRIMARY KEY (extractor, id, kind, format))"
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Download archive disabled: {e}")
+            self._db = None
+
+    def _execute(self, sql, params=(), fetch=False):
+        if self._db is None:
+            return [] if fetch else None
+        with self._lock:
+            try:
+                cursor = self._db.execute(sql, params)
+                rows = cursor.fetchall() if fetch else None
+                self._db.commit()
+                return rows
+            except sqlite3.Error as e:
+                print(f"Download archive error: {e}")
+                return [] if fetch else None
+
+    def lookup(self, extractor, video_id, kind, fmt):
+        if not extractor or not video_id:
+            return None
+        rows = self._execute("SELECT path, size, seconds, tagged FROM media "
+                             "WHERE extractor = ? AND id = ? AND kind = ? AND format = ?",
+                             (extractor, str(video_id), kind, fmt), fetch=True)
+        if not rows:
+            return None
+        path, size, seconds, tagged = rows[0]
+        if not os.path.exists(path):
+            self._execute("DELETE FROM media WHERE extractor = ? AND id = ? AND kind = ? AND format = ?",
+                          (extractor, str(video_id), kind, fmt))
+            return None
+        return {'path': path, 'size': size, 'seconds': seconds, 'tagged': bool(tagged)}
+
+    def add(self, extractor, video_id, kind, fmt, path, seconds, tagged=False):
+        # seconds: how long it took to get the file (download and conversion)
+        if not extractor or not video_id or not os.path.exists(path):
+            return
+        self._execute("INSERT OR REPLACE INTO media (extractor, id, kind, format, path, size, seconds, tagged, updated) "
+                      "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                      (extractor, str(video_id), kind, fmt, path, os.path.getsize(path), seconds, int(tagged), time.time()))
+
+    def set_tagged(self, extractor, video_id, kind, fmt, tagged=True):
+        self._execute("UPDATE media SET tagged = ? WHERE extractor = ? AND id = ? AND kind = ? AND format = ?",
+                      (int(tagged), extractor, str(video_id), kind, fmt))
+
+    def place(self, item, folder):
+        # Puts the archived file into folder and returns its path there
+        target = os.path.join(folder, os.path.basename(item['path']))
+        if not os.path.exists(target):
+            os.makedirs(folder, exist_ok=True)
+            try:
+                os.link(item['path'], target)
+            except OSError:
+                shutil.copy2(item['path'], target)
+        with self._lock:
+            self.reused += 1
+            self.saved_bytes += item['size'] or 0
+            self.saved_seconds += item['seconds'] or 0
+        return target
+
+    def stats(self):
+        with self._lock:
+            return {'reused': self.reused, 'saved_bytes': self.saved_bytes, 'saved_seconds': self.saved_seconds}
+
+
+media_archive = MediaArchive()
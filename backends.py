@@ -0,0 +1,100 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Where CPU-heavy Python work runs: tag writing with cover conversion
+# (tagging.tag_track) and lyric page parsing (metadata.parse_genius_lyrics).
+# "thread" uses threads of this process, "process" worker processes that
+# don't share the GIL with the download threads.
+BACKENDS = ("thread", "process")
+BACKEND = "thread"
+WORKERS = os.cpu_count() or 2
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+class ThreadBackend:
+    """
+    Runs work on a pool of `workers` threads, created on first use.
+    submit(func, *args, token=token) passes the cancel token on to func.
+    """
+    name = "thread"
+
+    def __init__(self, workers=None):
+        self.workers = workers or WORKERS
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _create_executor(self):
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cpu")
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            return self._executor
+
+    def submit(self, func, *args, token=None):
+        if token is None:
+            return self._get_executor().submit(func, *args)
+        token.check()
+        return self._get_executor().submit(func, *args, token=token)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+class ProcessBackend(ThreadBackend):
+    """
+    Runs work in `workers` persistent processes, started on first use with
+    the spawn method (forking a process that runs Qt and download threads
+    is not safe). func and its arguments must be picklable, so a cancel
+    token can't follow the work into the worker: it is checked before the
+    work is queued, queued work is dropped when it is cancelled, and work a
+    worker already started runs to the end.
+    A pool whose worker died is replaced on the next submit.
+    """
+    name = "process"
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, func, *args, token=None):
+        if token is not None:
+            token.check()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BrokenProcessPool:
+            print("Worker process pool broke, starting a new one")
+            self.shutdown(wait=False)
+            future = self._get_executor().submit(func, *args)
+        if token is not None:
+            token.add_callback(future.cancel)
+            future.add_done_callback(lambda f: token.remove_callback(future.cancel))
+        return future
+
+
+def get_backend(name=None):
+    # The shared backend called name, by default the one set with set_backend()
+    name = name or BACKEND
+    with _backends_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown execution backend: {name}")
+            backend = (ProcessBackend if name == "process" else ThreadBackend)()
+            _backends[name] = backend
+        return backend
+
+
+def set_backend(name):
+    global BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown execution backend: {name}")
+    BACKEND = name
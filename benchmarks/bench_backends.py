@@ -0,0 +1,141 @@
+"""
+Compares the thread and process execution backends on tagging a synthetic
+200-track local playlist. Every track goes through the same call the
+tagging service makes, get_backend().submit(tagging.tag_track, ...):
+cover art converted from the thumbnail "yt-dlp wrote" (and then removed),
+lyrics read from the lyrics cache (the service prefetches them before it
+tags) and the ID3 tags written with mutagen.
+
+While the tracks are tagged, a stand-in download thread spins on JSON
+parsing (what yt-dlp does between network reads) and reports how much it
+got done; with the thread backend it competes for the GIL.
+
+Everything is local, nothing is downloaded and ffmpeg is not needed. The
+caches live in a temporary folder, not the app's.
+
+    python benchmarks/bench_backends.py [--tracks 200] [--workers N] [--lines 400]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Set before metadata opens its caches. Spawned workers import this file
+# again as __mp_main__ and inherit the folder instead of making their own.
+if __name__ == "__main__":
+    os.environ["LOCALAPPDATA"] = tempfile.mkdtemp(prefix="bench_backends_cache")
+
+from PIL import Image
+from backends import ProcessBackend, ThreadBackend, WORKERS
+from metadata import lyrics_cache, lyrics_cache_key, LYRICS_CACHE_TTL
+from tagging import tag_track
+
+ARTIST = "Benchmark"
+
+
+def lyrics_text(lines):
+    return "\n".join(f"Line {n} of the verse, la la la" for n in range(lines))
+
+
+def make_playlist(folder, tracks, lyrics):
+    # Tracks with the thumbnail yt-dlp would have written next to each,
+    # and their lyrics in the cache
+    cover = Image.effect_noise((640, 640), 64).convert("RGB")
+    playlist = []
+    for n in range(tracks):
+        title = f"Track {n:03d}"
+        path = os.path.join(folder, f"{title}.mp3")
+        with open(path, "wb") as f:
+            f.write(b"\xff\xfb\x90\x00" * 1024)
+        thumbnail = os.path.join(folder, f"{title}.webp")
+        cover.save(thumbnail)
+        info = {
+            'title': title,
+            'uploader': ARTIST,
+            'album': "Synthetic",
+            'upload_date': "20240101",
+            'thumbnails': [{'url': "https://example.com/cover.webp", 'filepath': thumbnail}],
+        }
+        lyrics_cache.set(lyrics_cache_key(title, ARTIST), {'synced': None, 'plain': lyrics, 'found': True},
+                         LYRICS_CACHE_TTL)
+        playlist.append((path, info, f"https://example.com/track/{n}"))
+    return playlist
+
+
+@contextmanager
+def quiet():
+    # tag_track prints per track, in this process and in the workers
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+def download_thread(stop, counter):
+    # Python-side work of a download thread
+    blob = json.dumps({'formats': [{'format_id': str(n), 'url': 'https://x/' + 'a' * 80} for n in range(200)]})
+    while not stop.is_set():
+        json.loads(blob)
+        counter[0] += 1
+
+
+def run(backend, playlist):
+    # Warm-up starts the workers, so process start-up isn't part of the timing
+    for future in [backend.submit(len, "warm") for _ in range(backend.workers)]:
+        future.result()
+    stop, counter = threading.Event(), [0]
+    downloader = threading.Thread(target=download_thread, args=(stop, counter), daemon=True)
+    downloader.start()
+    start = time.perf_counter()
+    futures = [backend.submit(tag_track, path, info, url) for path, info, url in playlist]
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    downloader.join()
+    return elapsed, counter[0] / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--lines", type=int, default=400, help="lyric lines per track")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="bench_backends")
+    try:
+        lyrics = lyrics_text(args.lines)
+        print(f"{args.tracks} tracks, {args.workers} workers, {len(lyrics) // 1024} KB lyrics, {os.cpu_count()} cores")
+        for backend in (ThreadBackend(args.workers), ProcessBackend(args.workers)):
+            # A fresh playlist per backend: tagging removes the thumbnails
+            tracks_folder = os.path.join(folder, backend.name)
+            os.makedirs(tracks_folder)
+            playlist = make_playlist(tracks_folder, args.tracks, lyrics)
+            try:
+                with quiet():
+                    elapsed, parses = run(backend, playlist)
+            finally:
+                backend.shutdown()
+            print(f"{backend.name:8} {elapsed:7.3f} s  {args.tracks / elapsed:7.1f} tracks/s  "
+                  f"download thread: {parses:8.0f} JSON parses/s")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+        shutil.rmtree(os.environ["LOCALAPPDATA"], ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compares bare requests.get against the pooled httpclient for the HTTP
+traffic of a 100-track playlist (LRCLib, Genius search, Genius page,
+lyrics.ovh and cover art per track) against a local stub server.
+
+The stub counts accepted TCP connections; against the real services every
+one of them is also a TLS handshake.
+
+    python benchmarks/bench_http.py [--tracks 100] [--workers 4] [--latency 0.02]
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+import httpclient
+
+ENDPOINTS = ("/api/get", "/search", "/song", "/v1/lyrics", "/cover.jpg")
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.latency = latency
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        # Stands in for the connect + TLS handshake cost of a new connection
+        # on the first request only; later requests on the socket are cheap
+        if not getattr(self, "_warm", False):
+            time.sleep(self.server.latency)
+            self._warm = True
+        body = b'{"plainLyrics": "la la la"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(get, base_url, tracks, workers):
+    def track(n):
+        for path in ENDPOINTS:
+            get(f"{base_url}{path}?track={n}", timeout=10).content
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(track, range(tracks)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="simulated handshake cost per new connection, seconds")
+    args = parser.parse_args()
+
+    httpclient.configure(pool_size=args.workers)
+    for name, get in (("requests.get", requests.get), ("httpclient.get", httpclient.get)):
+        server = StubServer(args.latency)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        elapsed = run(get, base_url, args.tracks, args.workers)
+        server.shutdown()
+        server.server_close()
+        print(f"{name:15} {args.tracks * len(ENDPOINTS):5d} requests  "
+              f"{server.connections:5d} connections  {elapsed:7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def get_cache_folder():
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    folder = os.path.join(base, "MediaDownloader")
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+class PersistentCache:
+    """
+    Key/value cache with an in-memory LRU in front of a SQLite table.
+    Values must be JSON serializable and are stored zlib-compressed on disk.
+    Every entry has its own expiry time, expired entries are dropped when they
+    are read and the table is trimmed to max_disk_entries by last access.
+    If the database cannot be opened the cache keeps working from memory only.
+    """
+
+    def __init__(self, name, default_ttl=3600, max_memory_entries=256, max_disk_entries=5000, path=None):
+        self.name = name
+        self.default_ttl = default_ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.path = path or os.path.join(get_cache_folder(), f"{name}.sqlite3")
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.RLock()
+        self._db = None
+        try:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB, expires REAL, accessed REAL, size INTEGER)"
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"{name} cache disabled on disk: {e}")
+            self._db = None
+
+    def _remember(self, key, expires, value):
+        self._memory[key] = (expires, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                expires, value = item
+                if expires > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        blob, expires = row
+                        if expires > now:
+                            value = json.loads(zlib.decompress(blob))
+                            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                            self._db.commit()
+                            self._remember(key, expires, value)
+                            self.hits += 1
+                            return value
+                        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                        self._db.commit()
+                except (sqlite3.Error, zlib.error, ValueError) as e:
+                    print(f"{self.name} cache read error: {e}")
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires = now + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, expires, value)
+            if self._db is None:
+                return
+            try:
+                blob = zlib.compress(json.dumps(value).encode("utf-8"))
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, expires, now, len(blob)),
+                )
+                count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                if count > self.max_disk_entries:
+                    self._db.execute(
+                        "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed ASC LIMIT ?)",
+                        (count - self.max_disk_entries,),
+                    )
+                self._db.commit()
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                print(f"{self.name} cache write error: {e}")
+
+    def delete(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"{self.name} cache delete error: {e}")
+
+    def purge(self, predicate):
+        # Deletes every entry for which predicate(key, value) is true, returns how many
+        removed = set()
+        with self._lock:
+            for key, (_, value) in list(self._memory.items()):
+                if predicate(key, value):
+                    del self._memory[key]
+                    removed.add(key)
+            if self._db is not None:
+                try:
+                    doomed = []
+                    for key, blob in self._db.execute("SELECT key, value FROM entries"):
+                        if predicate(key, json.loads(zlib.decompress(blob))):
+                            doomed.append((key,))
+                    self._db.executemany("DELETE FROM entries WHERE key = ?", doomed)
+                    self._db.commit()
+                    removed.update(key for (key,) in doomed)
+                except (sqlite3.Error, zlib.error, ValueError) as e:
+                    print(f"{self.name} cache purge error: {e}")
+        return len(removed)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (expires, _) in self._memory.items() if expires <= now]:
+                del self._memory[key]
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"{self.name} cache purge error: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM entries")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"{self.name} cache clear error: {e}")
+
+    def stats(self):
+        with self._lock:
+            disk_entries, disk_bytes = 0, 0
+            if self._db is not None:
+                try:
+                    disk_entries, disk_bytes = self._db.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+                    ).fetchone()
+                except sqlite3.Error:
+                    pass
+            return {
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+                'disk_bytes': disk_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
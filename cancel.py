@@ -0,0 +1,71 @@
+import threading
+from contextlib import contextmanager, nullcontext
+from results import DownloadCancelled
+
+
+class CancelToken:
+    """
+    Cancellation of one job. Work checks the token between steps (check()
+    raises results.DownloadCancelled), and blocking work registers a
+    callback with on_cancel() that interrupts it (kills an ffmpeg process,
+    wakes a lyrics lookup), so a cancel frees resources right away instead
+    of on the next progress tick. Every job has its own token: cancelling
+    one never touches another.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Cancel callback error: {e}")
+
+    def check(self, message="Download cancelled"):
+        if self._event.is_set():
+            raise DownloadCancelled(message)
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+    def add_callback(self, callback):
+        # callback() runs once the token is cancelled, right away if it already is
+        with self._lock:
+            registered = not self._event.is_set()
+            if registered:
+                self._callbacks.append(callback)
+        if not registered:
+            callback()
+
+    def remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    @contextmanager
+    def on_cancel(self, callback):
+        # callback() runs if the token is cancelled while the block runs,
+        # or right away if it already was
+        self.add_callback(callback)
+        try:
+            yield
+        finally:
+            self.remove_callback(callback)
+
+
+def on_cancel(token, callback):
+    # token.on_cancel(callback) for an optional token
+    return token.on_cancel(callback) if token is not None else nullcontext()
@@ -0,0 +1,126 @@
+"""
+Headless front end for the download engine. Prints one JSON object per line
+on stdout (start, status, progress, tagged, error and done events); anything
+else the engine, its worker processes or ffmpeg print goes to stderr. Never
+imports Qt.
+
+    python -m cli [-m audio|video] [-q QUALITY] [-j JOBS] [-i FILE ...] [URL ...]
+    cat urls.txt | python -m cli -m video -q 720
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import backends
+import downloader
+from tagging import tagging_service
+
+_out = sys.stdout
+_out_lock = threading.Lock()
+
+
+def emit(event, **fields):
+    line = json.dumps(dict(event=event, time=round(time.time(), 3), **fields), default=str)
+    with _out_lock:
+        _out.write(line + "\n")
+        _out.flush()
+
+
+def read_urls(paths, urls):
+    # URLs from the command line, then from each file ('-' is stdin); blank lines and # comments are skipped
+    found = list(urls)
+    for path in paths:
+        lines = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+        with lines:
+            for line in lines:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    found.append(line)
+    return found
+
+
+def is_playlist(url, mode):
+    if mode == "auto":
+        return "playlist" in url.lower()
+    return mode == "yes"
+
+
+def run_url(url, args):
+    started = time.monotonic()
+    emit("start", url=url)
+    status = lambda text: emit("status", url=url, text=text)
+    snapshot = lambda snap: emit("progress", url=url, **snap)
+    tagged = lambda path, ok: emit("tagged", url=url, file=path, ok=ok)
+    playlist = is_playlist(url, args.playlist)
+    if args.mode == "audio" and playlist:
+        result = downloader.download_playlist(url, status_callback=status, tag_callback=tagged,
+                                              snapshot_callback=snapshot)
+    elif args.mode == "audio":
+        result = downloader.download_video(url, status_callback=status, tag_callback=tagged, snapshot_callback=snapshot)
+    elif playlist:
+        result = downloader.download_playlist_video(url, quality=args.quality, status_callback=status,
+                                                    snapshot_callback=snapshot)
+    else:
+        result = downloader.download_video_file(url, quality=args.quality, status_callback=status,
+                                                snapshot_callback=snapshot)
+    if not result:
+        emit("error", url=url, type=type(result.error).__name__, title=result.error_title, message=result.message)
+    emit("done", seconds=round(time.monotonic() - started, 3), **result.to_dict())
+    return result.ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cli", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("urls", nargs="*", help="URLs to download")
+    parser.add_argument("-i", "--input", action="append", default=[], metavar="FILE",
+                        help="file with one URL per line, '-' for stdin (repeatable)")
+    parser.add_argument("-m", "--mode", choices=("audio", "video"), default="audio")
+    parser.add_argument("-q", "--quality", default="best", help="video height such as 1080, or best")
+    parser.add_argument("-f", "--audio-format", choices=downloader.AUDIO_FORMATS, default=downloader.AUDIO_FORMAT)
+    parser.add_argument("-p", "--playlist", choices=("auto", "yes", "no"), default="auto",
+                        help="treat URLs as playlists (auto: URLs containing 'playlist')")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="URLs downloaded at the same time")
+    parser.add_argument("-w", "--playlist-workers", type=int, help="parallel downloads inside a playlist")
+    parser.add_argument("-o", "--output", help="download folder")
+    parser.add_argument("-b", "--backend", choices=backends.BACKENDS, default=backends.BACKEND,
+                        help="write tags and parse lyric pages on threads or in worker processes")
+    args = parser.parse_args(argv)
+
+    inputs = args.input
+    if not args.urls and not inputs and not sys.stdin.isatty():
+        inputs = ["-"]
+    urls = read_urls(inputs, args.urls)
+    if not urls:
+        parser.error("no URLs given")
+
+    # Progress lines own stdout. Worker processes and ffmpeg write to fd 1
+    # directly, so fd 1 itself is pointed at stderr and emit() keeps a copy
+    # of the real stdout.
+    global _out
+    sys.stdout.flush()
+    _out = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    downloader.set_audio_format(args.audio_format)
+    backends.set_backend(args.backend)
+    if args.playlist_workers:
+        downloader.set_playlist_workers(args.playlist_workers)
+    if args.output:
+        folder = os.path.abspath(args.output)
+        downloader.set_audio_download_folder(folder)
+        downloader.set_video_download_folder(folder)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        results = list(executor.map(lambda url: run_url(url, args), urls))
+    # Single audio downloads return before their tags are written
+    tagging_service.join()
+    emit("finished", ok=sum(results), failed=len(results) - sum(results))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+
+def host_of(url):
+    host = urlsplit(url or "").netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency gate for playlist downloads.
+    Workers hold a slot() while they download. The number of slots (width)
+    starts at `initial` and is re-evaluated every `interval` seconds from the
+    bytes reported through record_progress():
+      - if any host failed more than `max_error_rate` of its jobs in the last
+        window, the width is halved
+      - otherwise it hill-climbs: keep moving the width in the same direction
+        while aggregate throughput grows, hold it on a plateau and reverse
+        when throughput falls
+    No single host ever gets more than `per_host` slots.
+    on_change(width, bytes_per_second) is called after every evaluation.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=16, per_host=6, interval=5.0,
+                 max_error_rate=0.2, on_change=None):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.width = min(max(initial, self.minimum), self.maximum)
+        self.per_host = max(1, per_host)
+        self.interval = interval
+        self.max_error_rate = max_error_rate
+        self.on_change = on_change
+        self.throughput = 0.0
+        self._active = 0
+        self._host_active = defaultdict(int)
+        self._host_results = defaultdict(lambda: [0, 0])  # host -> [ok, failed] in this window
+        self._last_bytes = {}
+        self._window_bytes = 0
+        self._window_start = time.monotonic()
+        self._previous_throughput = 0.0
+        self._direction = 1
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self, host=""):
+        with self._cond:
+            while self._active >= self.width or self._host_active[host] >= self.per_host:
+                self._cond.wait(timeout=1.0)
+                self._maybe_adjust()
+            self._active += 1
+            self._host_active[host] += 1
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._host_active[host] -= 1
+                self._host_results[host][0 if ok else 1] += 1
+                self._maybe_adjust()
+                self._cond.notify_all()
+
+    def record_progress(self, key, downloaded_bytes):
+        # Fed from yt-dlp progress hooks with the cumulative byte count of one file
+        with self._cond:
+            previous = self._last_bytes.get(key, 0)
+            self._last_bytes[key] = downloaded_bytes
+            if downloaded_bytes > previous:
+                self._window_bytes += downloaded_bytes - previous
+            self._maybe_adjust()
+
+    def _maybe_adjust(self):
+        # Caller holds self._cond
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed < self.interval:
+            return
+        self.throughput = self._window_bytes / elapsed
+        old_width = self.width
+        error_rates = [failed / (ok + failed) for ok, failed in self._host_results.values() if ok + failed]
+        if error_rates and max(error_rates) > self.max_error_rate:
+            self.width = max(self.minimum, self.width // 2)
+            self._direction = 1
+        elif self._active >= self.width:
+            # Only judge the width when all slots were actually in use
+            if self.throughput > self._previous_throughput * 1.1:
+                self._direction = self._direction or 1
+            elif self.throughput < self._previous_throughput * 0.9:
+                self._direction = -(self._direction or 1)
+            else:
+                self._direction = 0
+            self.width = min(max(self.width + self._direction, self.minimum), self.maximum)
+        self._previous_throughput = self.throughput
+        self._window_bytes = 0
+        self._window_start = now
+        self._host_results.clear()
+        if self.width > old_width:
+            self._cond.notify_all()
+        if self.on_change:
+            try:
+                self.on_change(self.width, self.throughput)
+            except Exception as e:
+                print(f"Concurrency callback error: {e}")
@@ -1,7 +1,23 @@
 import os,re
-from tkinter import messagebox, filedialog
+import time
+import threading
+import itertools
+from collections import Counter
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from yt_dlp import YoutubeDL
-from metadata import add_metadata
+from tagging import tagging_service
+import httpclient
+from cache import PersistentCache
+from concurrency import AdaptiveLimiter, host_of
+from pipeline import Stage, StagedPipeline
+from postprocess import extract_audio, remux_audio
+from journal import journal
+from archive import media_archive
+from scheduler import scheduler
+from cancel import CancelToken, on_cancel
+from results import (DownloadResult, DownloadCancelled, ExtractionError, as_error)
+from progress import (format_bytes, ProgressAggregator, QUEUED, EXTRACTING, DOWNLOADING, POSTPROCESSING, TAGGING,
+                      DONE, FAILED)
 from functools import partial
 import yt_dlp as youtube_dl
 
@@ -9,9 +25,65 @@ import yt_dlp as youtube_dl
 AUDIO_DOWNLOAD_FOLDER = None
 VIDEO_DOWNLOAD_FOLDER = None
 
-# Global cancel flags (reset before each download)
-aCANCEL_FLAG = False
-vCANCEL_FLAG = False
+# Audio output: "mp3" transcodes to 320k MP3, "native" keeps the source codec and only remuxes
+AUDIO_FORMATS = ("mp3", "native")
+AUDIO_FORMAT = "mp3"
+
+# Playlist concurrency: starting width, upper bound and per-host cap
+PLAYLIST_WORKERS = 4
+MAX_PLAYLIST_WORKERS = 16
+PER_HOST_CONNECTIONS = 6
+
+# Workers for the other audio playlist stages (tagging has its own service)
+RESOLVE_WORKERS = 4
+POSTPROCESS_WORKERS = os.cpu_count() or 2
+TAGGING_WORKERS = tagging_service.lookup_workers
+httpclient.configure(pool_size=max(PLAYLIST_WORKERS, TAGGING_WORKERS))
+
+# Extractor round trips per entry url (see get_extraction_stats)
+EXTRACTION_COUNTS = Counter()
+_extraction_lock = threading.Lock()
+
+# Shared info dict cache (memory + disk). Signed media urls expire, so the
+# time to live depends on the extractor that produced the info dict.
+INFO_CACHE_TTLS = {
+    'Youtube': 2 * 3600,
+    'YoutubeTab': 30 * 60,
+    'YoutubeSearch': 15 * 60,
+}
+INFO_CACHE_DEFAULT_TTL = 3600
+info_cache = PersistentCache('info', default_ttl=INFO_CACHE_DEFAULT_TTL, max_memory_entries=128, max_disk_entries=2000)
+
+# Info dicts whose signed media urls expire within this many seconds are extracted again
+SIGNED_URL_MARGIN = 10 * 60
+_EXPIRE_RE = re.compile(r'[?&/]expire[=/](\d+)')
+
+# Query parameters that never change what a url resolves to
+_TRACKING_PARAMS = {'si', 'feature', 'pp', 'ab_channel', 'fbclid', 'gclid'}
+# Query parameters of a YouTube watch url that change what it resolves to
+_WATCH_PARAMS = {'v', 'list', 'index'}
+
+# Called as listener(result) with the DownloadResult of every failed download.
+# The engine never shows errors itself, front ends subscribe here.
+ERROR_LISTENERS = []
+
+def add_error_listener(listener):
+    ERROR_LISTENERS.append(listener)
+
+def remove_error_listener(listener):
+    if listener in ERROR_LISTENERS:
+        ERROR_LISTENERS.remove(listener)
+
+def failed_result(kind, url, title, message, e):
+    # DownloadResult for a download that raised e, passed to the error listeners
+    error = as_error(e)
+    result = DownloadResult(kind, url, error=error, error_title=title, message=f"{message}: {error}")
+    for listener in list(ERROR_LISTENERS):
+        try:
+            listener(result)
+        except Exception as listener_error:
+            print(f"Error listener failed: {listener_error}")
+    return result
 
 def set_audio_download_folder(folder):
     global AUDIO_DOWNLOAD_FOLDER
@@ -21,21 +93,145 @@ def set_video_download_folder(folder):
     global VIDEO_DOWNLOAD_FOLDER
     VIDEO_DOWNLOAD_FOLDER = folder
 
-def acancel_download():
-    global aCANCEL_FLAG
-    aCANCEL_FLAG = True
-
-def vcancel_download():
-    global vCANCEL_FLAG
-    vCANCEL_FLAG = True
-
-def reset_vcancel_flag():
-    global vCANCEL_FLAG
-    vCANCEL_FLAG = False
-
-def reset_acancel_flag():
-    global aCANCEL_FLAG
-    aCANCEL_FLAG = False
+def set_audio_format(audio_format):
+    global AUDIO_FORMAT
+    if audio_format not in AUDIO_FORMATS:
+        raise ValueError(f"Unknown audio format: {audio_format}")
+    AUDIO_FORMAT = audio_format
+
+def set_playlist_workers(workers):
+    global PLAYLIST_WORKERS
+    PLAYLIST_WORKERS = max(1, min(int(workers), MAX_PLAYLIST_WORKERS))
+    httpclient.configure(pool_size=max(PLAYLIST_WORKERS, TAGGING_WORKERS))
+
+def _make_playlist_limiter(max_workers, pool_callback):
+    on_change = None
+    if pool_callback:
+        on_change = lambda width, throughput: pool_callback(width, throughput / 1024 / 1024)
+    return AdaptiveLimiter(initial=max_workers or PLAYLIST_WORKERS, maximum=MAX_PLAYLIST_WORKERS,
+                           per_host=PER_HOST_CONNECTIONS, on_change=on_change)
+
+def throughput_hook(d, limiter, key):
+    # Feeds downloaded bytes to the playlist limiter
+    if d.get("status") == "downloading":
+        limiter.record_progress(f"{key}:{d.get('filename')}", d.get("downloaded_bytes") or 0)
+
+def job_token(job):
+    # Cancel token of a scheduler job; downloads started without a job get
+    # one nobody can cancel
+    return job.token if job is not None else CancelToken()
+
+def extract_info(ydl, url, **kwargs):
+    # Every non-download extraction goes through here so it can be counted
+    with _extraction_lock:
+        EXTRACTION_COUNTS[url] += 1
+    try:
+        return ydl.extract_info(url, download=False, **kwargs)
+    except youtube_dl.utils.DownloadError as e:
+        raise ExtractionError(str(e)) from e
+
+def download_from_info(ydl, info):
+    # Download and post-process an already extracted info dict without
+    # resolving the url again (same path as yt-dlp's --load-info-json)
+    return ydl.process_ie_result(ydl.sanitize_info(info, True), download=True)
+
+def normalize_url(url):
+    # Canonical cache key for a url: lower-case host without www./m.,
+    # youtu.be and shorts links rewritten to watch urls, tracking params dropped
+    url = url.strip()
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        return url
+    host = parts.netloc.lower()
+    for prefix in ("www.", "m.", "music."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    path = parts.path.rstrip('/') or '/'
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in _TRACKING_PARAMS and not k.startswith('utm_')]
+    if host == "youtu.be":
+        host, query, path = "youtube.com", [('v', path.lstrip('/'))] + query, "/watch"
+    elif host == "youtube.com" and path.startswith("/shorts/"):
+        query, path = [('v', path.split('/')[2])] + query, "/watch"
+    if host == "youtube.com" and path == "/watch":
+        # watch?v=X&list=Y resolves to the playlist, so list and index stay in the key
+        query = [(k, v) for k, v in query if k in _WATCH_PARAMS]
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+def _info_cache_key(url, flat=False):
+    return ("flat:" if flat else "full:") + normalize_url(url)
+
+def info_expired(info, margin=SIGNED_URL_MARGIN):
+    # True if a signed media url of info (YouTube's expire=<unix time>, as a query
+    # param or /expire/<time>/ in manifest paths) expires within margin seconds
+    deadline = time.time() + margin
+    for fmt in info.get('formats') or [info]:
+        match = _EXPIRE_RE.search(fmt.get('url') or '')
+        if match and int(match.group(1)) < deadline:
+            return True
+    return False
+
+def cached_extract_info(url, ydl=None, flat=False):
+    # Returns the info dict for url from the shared cache, extracting it
+    # (with ydl, or a quiet instance) only when it is missing, expired or its
+    # signed media urls are about to expire
+    key = _info_cache_key(url, flat)
+    info = info_cache.get(key)
+    if info is not None and (flat or not info_expired(info)):
+        return info
+    if ydl is None:
+        ydl_opts = {'quiet': True, 'extract_flat': True} if flat else {'quiet': True}
+        with YoutubeDL(ydl_opts) as quiet_ydl:
+            info = extract_info(quiet_ydl, url)
+    else:
+        info = extract_info(ydl, url)
+    if not info:
+        return None
+    info = YoutubeDL.sanitize_info(info)
+    ttl = INFO_CACHE_TTLS.get(info.get('extractor_key'), INFO_CACHE_DEFAULT_TTL)
+    info_cache.set(key, info, ttl)
+    return info
+
+def invalidate_info(url):
+    info_cache.delete(_info_cache_key(url, False))
+    info_cache.delete(_info_cache_key(url, True))
+
+def download_url(ydl, url, info=None):
+    # Downloads url from info (an info dict the caller already has, e.g. from
+    # get_available_qualities) or the cached one. Info whose signed media urls
+    # are about to expire is not used. If the download fails (e.g. the urls
+    # were revoked early) the url is extracted again once.
+    if info is None or info_expired(info):
+        info = cached_extract_info(url, ydl)
+    try:
+        return download_from_info(ydl, info)
+    except youtube_dl.utils.DownloadError as e:
+        if isinstance(as_error(e), DownloadCancelled):
+            raise as_error(e)
+        print(f"Cached info failed for {url}, extracting again: {e}")
+        invalidate_info(url)
+    try:
+        return download_from_info(ydl, cached_extract_info(url, ydl))
+    except youtube_dl.utils.DownloadError as e:
+        raise as_error(e) from e
+
+def get_extraction_stats(urls=None):
+    # Returns how many extractions were made in total and per entry,
+    # optionally limited to the given entry urls
+    with _extraction_lock:
+        counts = dict(EXTRACTION_COUNTS)
+    if urls is not None:
+        counts = {url: counts.get(url, 0) for url in urls}
+    entries = len(counts)
+    extractions = sum(counts.values())
+    return {
+        'entries': entries,
+        'extractions': extractions,
+        'per_entry': extractions / entries if entries else 0.0,
+    }
+
+def reset_extraction_stats():
+    with _extraction_lock:
+        EXTRACTION_COUNTS.clear()
 
 def get_default_audio_folder():
     global AUDIO_DOWNLOAD_FOLDER
@@ -55,140 +251,135 @@ def get_default_video_folder():
     os.makedirs(folder, exist_ok=True)
     return folder
 
-def aprogress_hook(d,isFromSearch, status_callback=None, item_index=None, total_items=None):    #audio progress hook
-    global aCANCEL_FLAG
-    if aCANCEL_FLAG and not isFromSearch:
-        raise Exception("Audio Download Cancelled by User")
-    
-    status = d.get("status")
-    if status == "downloading":
-        downloaded_bytes = d.get("downloaded_bytes", 0)
-        total_bytes = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
-        downloaded_mb = downloaded_bytes / 1024 / 1024
-        if total_bytes > 0:
-            total_mb = total_bytes / 1024 / 1024
-            text = f"Downloaded {downloaded_mb:.2f} MB / {total_mb:.2f} MB"
-        else:
-            text = f"Downloaded {downloaded_mb:.2f} MB"
-        if status_callback:
-            status_callback(text)
-    elif status == "finished":
-        text = "Download finished." if not (item_index and total_items) else "Finished downloading."
-        if status_callback:
-            status_callback(text)
-
-def vprogress_hook(d,isFromSearch, status_callback=None, item_index=None, total_items=None):  #video progress hook
-    global vCANCEL_FLAG
-    if vCANCEL_FLAG and not isFromSearch:
-        raise Exception("Video Download Cancelled by User")
-    
-    status = d.get("status")
-    if status == "downloading":
-        downloaded_bytes = d.get("downloaded_bytes", 0)
-        total_bytes = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
-        downloaded_mb = downloaded_bytes / 1024 / 1024
-        if total_bytes > 0:
-            total_mb = total_bytes / 1024 / 1024
-            text = f"Downloaded {downloaded_mb:.2f} MB / {total_mb:.2f} MB"
-        else:
-            text = f"Downloaded {downloaded_mb:.2f} MB"
-        if status_callback:
-            status_callback(text)
-    elif status == "finished":
-        text = "Download finished." if not (item_index and total_items) else "Finished downloading."
-        if status_callback:
-            status_callback(text)
-
-def download_video(url,isFromSearch=False, status_callback=None):  
+def aprogress_hook(d, token, progress=None, key=None):    #audio progress hook
+    # Ticks only go to the aggregator, which publishes them to the UI at a fixed rate
+    token.check("Audio Download Cancelled by User")
+    if progress is not None:
+        progress.update(key, d)
+
+def vprogress_hook(d, token, progress=None, key=None):  #video progress hook
+    token.check("Video Download Cancelled by User")
+    if progress is not None:
+        progress.update(key, d)
+
+def archive_key(info):
+    # (extractor, id) of a full info dict or a flat playlist entry
+    return info.get('extractor_key') or info.get('ie_key'), info.get('id')
+
+def tag_audio(file_path, info, url, fmt, callback=None, token=None):
+    # Hands the file to the tagging service and marks it tagged in the archive once done
+    key = archive_key(info)
+    # Plain data only, the tags may be written in a worker process
+    info = YoutubeDL.sanitize_info(info)
+    future = tagging_service.submit(file_path, info, url, callback=callback, token=token)
+    future.add_done_callback(lambda f: f.exception() is None and media_archive.set_tagged(*key, 'audio', fmt))
+    return future
+
+def archive_savings(before):
+    # What the archive saved since media_archive.stats() returned `before`
+    after = media_archive.stats()
+    saved = {key: after[key] - before[key] for key in after}
+    if saved['reused']:
+        saved['text'] = (f"Reused {saved['reused']} files already downloaded, saved "
+                         f"{format_bytes(saved['saved_bytes'])} and {saved['saved_seconds']:.1f} s")
+        print(saved['text'])
+    return saved
+
+def downloaded_file(ydl, info):
+    # Path of the file yt-dlp wrote for info (before any of our post-processing)
+    downloads = info.get('requested_downloads') or []
+    if downloads and downloads[-1].get('filepath'):
+        return downloads[-1]['filepath']
+    return ydl.prepare_filename(info)
+
+def convert_audio(file_path, info, fmt, token=None):
+    # Turns a downloaded file into audio format fmt (one of AUDIO_FORMATS); cancelling token kills ffmpeg
+    if fmt == "native":
+        return remux_audio(file_path, info.get('acodec'), token)
+    return extract_audio(file_path, 'mp3', '320', token)
+
+def download_video(url,isFromSearch=False, status_callback=None, tag_callback=None, snapshot_callback=None, job=None,
+                   audio_format=None):  
     # this function downloads video as audio and  add metadata also(best for music etc)
     # This function downloads audio (using yt-dlp’s audio extraction)
+    # Tags are written by the background tagging service; tag_callback(file_path, ok)
+    # is called once that is done (the download itself returns before).
+    # Progress is published at most 10 times a second, as text to status_callback
+    # and as a snapshot dict (see progress.ProgressAggregator) to snapshot_callback.
+    # The transfer and the conversion each wait for a slot of the global
+    # budget (see scheduler.Scheduler), on behalf of job if given. Cancelling
+    # the job's token stops the download, ffmpeg and the lyrics lookup.
+    # isFromSearch is no longer used: every job is cancelled on its own.
+    # audio_format is the output format, AUDIO_FORMAT by default; callers that
+    # queue the download pass the one selected when it was queued.
+    # Returns a results.DownloadResult, falsy if the download failed
+    token = job_token(job)
     try:
-        reset_acancel_flag()
         download_folder = get_default_audio_folder()
         os.makedirs(download_folder, exist_ok=True)
+        fmt = audio_format or AUDIO_FORMAT
+        token.check("Audio Download Cancelled by User")
+        info = cached_extract_info(url)
+        token.check("Audio Download Cancelled by User")
+        if not info:
+            raise ExtractionError(f"No media found at {url}")
+        archived = media_archive.lookup(*archive_key(info), 'audio', fmt)
+        if archived:
+            audio_file = media_archive.place(archived, download_folder)
+            if status_callback:
+                status_callback(f"Already downloaded, reused {os.path.basename(audio_file)}")
+            if not archived['tagged']:
+                tag_audio(audio_file, info, url, fmt, callback=tag_callback, token=token)
+            elif tag_callback:
+                tag_callback(audio_file, True)
+            return DownloadResult('audio', url, files=[audio_file], reused=1)
+        progress = ProgressAggregator(status_callback, snapshot_callback)
         ydl_opts = {
             'format': 'bestaudio/best',
             'outtmpl': os.path.join(download_folder, '%(title)s.%(ext)s'),
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '320',
-            }],
             'quiet': True,
             'writethumbnail': True,
-            'postprocessor_args': [
-                '-metadata', 'title=%(title)s',
-                '-metadata', 'artist=%(uploader)s'
-            ],
             'progress_hooks': [
-                lambda d: aprogress_hook(d,isFromSearch, status_callback=status_callback)
+                partial(aprogress_hook, token=token, progress=progress, key=url)
             ],
         }
-        with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            filename = ydl.prepare_filename(info)
-            mp3_file = os.path.splitext(filename)[0] + '.mp3'
-        original_title = info.get('title', 'Unknown Title')
-        
-        metadata = {
-            'title': original_title,
-            'artists': info.get('artist') or [info.get('uploader', 'Unknown Artist')],
-            'album': info.get('album', 'Unknown Album'),
-            'year': str(info.get('release_year', info.get('upload_date', '')[:4] or 'Unknown Year')),
-            'genre': info.get('genre', 'Unknown Genre'),
-            'thumbnail_url': info.get('thumbnail', ''),
-        }
-        otl=""
-        arti = None
-        
-        isFromYoutube = False
-        if "youtube" in url or "youtu.be" in url:
-         if any(keyword in original_title.lower() for keyword in ["official", "video", "lyric","mashup","audio","-"]):
-           
-           if isinstance(original_title, list):
-              original_title = " ".join(original_title)
-           if '-' in original_title:
-             arti, rest = [part.strip() for part in original_title.split('-', 1)]
-             titl = re.sub(r'(\(.*?\)|\[.*?\])', '', rest).strip()
-             jugad = f"{arti}, {titl}"
-             print(arti,titl,jugad)
-             metadata['title'] = titl
-             otl = original_title
-             
-             print(metadata['artists'])
-             if not metadata['artists']:
-              metadata["artists"]=arti
-             print(metadata['artists'])
-             isFromYoutube = True
-        
-        print("Final title:", metadata['title'])
-        add_metadata(
-            mp3_file,
-            metadata['title'],
-            metadata['artists'],
-            metadata['album'],
-            metadata['year'],
-            metadata['genre'],
-            metadata['thumbnail_url'],
-            isFromYoutube,
-            otl,
-            arti
-        )
-        webp_file = os.path.splitext(filename)[0] + '.webp'
-        if os.path.exists(webp_file):
-            os.remove(webp_file)
-        return True
+        started = time.monotonic()
+        with progress, scheduler.slot('network', job), YoutubeDL(ydl_opts) as ydl:
+            info = download_url(ydl, url)
+            filename = downloaded_file(ydl, info)
+        with scheduler.slot('cpu', job):
+            audio_file = convert_audio(filename, info, fmt, token)
+        media_archive.add(*archive_key(info), 'audio', fmt, audio_file, time.monotonic() - started)
+        tag_audio(audio_file, info, url, fmt, callback=tag_callback, token=token)
+        return DownloadResult('audio', url, files=[audio_file])
     except Exception as e:
-        messagebox.showerror("Download Error", f"Failed to download audio: {str(e)}")
-        return False
+        return failed_result('audio', url, "Download Error", "Failed to download audio", e)
 
-def download_video_file(url,isFromSearch=False, quality="best", status_callback=None):
+def download_video_file(url,isFromSearch=False, quality="best", status_callback=None, snapshot_callback=None, info=None,
+                        job=None):
 
     # This function downloads video in mp4 format(as video)
+    # info: the info dict from get_available_qualities, downloaded from directly
+    # instead of extracting the video again (unless its media urls have expired).
+    # Cancelling job stops it on the next progress tick (see download_video).
+    # Returns a results.DownloadResult, falsy if the download failed
+    token = job_token(job)
     try:
-        reset_vcancel_flag()
         download_folder = get_default_video_folder()
         os.makedirs(download_folder, exist_ok=True)
+        token.check("Video Download Cancelled by User")
+        if not info:
+            info = cached_extract_info(url)
+            token.check("Video Download Cancelled by User")
+            if not info:
+                raise ExtractionError(f"No media found at {url}")
+        archived = media_archive.lookup(*archive_key(info), 'video', quality)
+        if archived:
+            path = media_archive.place(archived, download_folder)
+            if status_callback:
+                status_callback(f"Already downloaded, reused {os.path.basename(path)}")
+            return DownloadResult('video', url, files=[path], reused=1)
+        progress = ProgressAggregator(status_callback, snapshot_callback)
         fmt = "bestvideo+bestaudio/best" if quality == "best" else f"bestvideo[height<={quality}]+bestaudio/best[height<={quality}]"
         ydl_opts = {
             'format': fmt,
@@ -196,231 +387,469 @@ def download_video_file(url,isFromSearch=False, quality="best", status_callback=
             'outtmpl': os.path.join(download_folder, '%(title)s.%(ext)s'),
             'quiet': True,
             'progress_hooks': [
-                lambda d: vprogress_hook(d,isFromSearch, status_callback=status_callback)
+                partial(vprogress_hook, token=token, progress=progress, key=url)
             ],
         }
-        with YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-        return True
+        started = time.monotonic()
+        # yt-dlp merges the streams inside the network slot
+        with progress, scheduler.slot('network', job), YoutubeDL(ydl_opts) as ydl:
+            info = download_url(ydl, url, info)
+            path = downloaded_file(ydl, info)
+        media_archive.add(*archive_key(info), 'video', quality, path, time.monotonic() - started)
+        return DownloadResult('video', url, files=[path])
     except Exception as e:
-        messagebox.showerror("Video Download Error", f"Failed to download video: {str(e)}")
-        return False
+        return failed_result('video', url, "Video Download Error", "Failed to download video", e)
 
 def returnUrlInfo(url):
-    with YoutubeDL({'quiet': True}) as ydl:
-        res = ydl.extract_info(url, download=False)
-        return res if res else None
-
-def returnAudPlayUrlInfo(url):
-    ydl_opts = {'quiet': True, 'extract_flat': True}
-    with YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=False)
+    res = cached_extract_info(url)
+    return res if res else None
+
+def entry_thumbnail(entry):
+    # Thumbnail of a flat playlist / search entry without extracting it: its own
+    # thumbnail(s) if the flat pass had them, for YouTube the one derived from the id
+    if entry.get('thumbnail'):
+        return entry['thumbnail']
+    thumbnails = entry.get('thumbnails') or []
+    if thumbnails and thumbnails[-1].get('url'):
+        return thumbnails[-1]['url']
+    if entry.get('id') and entry.get('ie_key') == 'Youtube':
+        return f"https://i.ytimg.com/vi/{entry['id']}/hqdefault.jpg"
+    return ''
+
+def returnAudPlayUrlInfo(url, thumbnail_callback=None):
+    # [title, number of entries, thumbnail url] of a playlist for the preview.
+    # Served from the flat extraction cache when possible, otherwise only the first
+    # page of the playlist is fetched (process=False keeps the entries lazy) as long
+    # as the extractor reports the entry count. If the flat pass has no thumbnail
+    # for the first entry, '' is returned and, given thumbnail_callback, the entry
+    # is extracted in the background and thumbnail_callback(thumbnail_url or '') called
+    first_entry, num_files = None, None
+    if info_cache.get(_info_cache_key(url, True)) is None:
+        with YoutubeDL({'quiet': True, 'extract_flat': True}) as ydl:
+            info = extract_info(ydl, url, process=False)
+            if info and info.get('_type') == 'playlist' and info.get('playlist_count') is not None:
+                num_files = info['playlist_count']
+                first_entry = next(iter(info.get('entries') or []), None)
+    if num_files is None:
+        info = cached_extract_info(url, flat=True)
+        entries = info.get('entries', [])
+        first_entry = entries[0] if entries else None
+        num_files = len(entries)
     playlist_title = info.get('title', 'unknown')
-    entries = info.get('entries', [])
-    num_files = len(entries)
-    thumbnail_url = ''
-    if entries:
-        first_entry = entries[0]
-        thumbnail_url = first_entry.get('thumbnail', '')
-        if not thumbnail_url:
-            first_video_url = first_entry.get('url')
-            if first_video_url:
-                with YoutubeDL({'quiet': True}) as ydl:
-                    first_video_info = ydl.extract_info(first_video_url, download=False)
-                    thumbnail_url = first_video_info.get('thumbnail', '')
+    thumbnail_url = entry_thumbnail(first_entry) if first_entry else ''
+    if not thumbnail_url and thumbnail_callback:
+        first_video_url = first_entry and (first_entry.get('webpage_url') or first_entry.get('url'))
+
+        def resolve_thumbnail():
+            thumbnail = ''
+            try:
+                if first_video_url:
+                    thumbnail = (cached_extract_info(first_video_url) or {}).get('thumbnail', '')
+            except Exception as e:
+                print(f"Could not resolve playlist thumbnail: {e}")
+            thumbnail_callback(thumbnail or '')
+        threading.Thread(target=resolve_thumbnail, daemon=True).start()
     return [playlist_title, num_files, thumbnail_url]
 
-def download_playlist(playlist_url, status_callback=None, progress_callback_audio=None):
+def journal_entry(entry):
+    # The part of a flat playlist entry a resumed job needs
+    return {key: entry.get(key) for key in ('id', 'ie_key', 'title', 'url', 'webpage_url') if entry.get(key)}
+
+def open_playlist_job(kind, playlist_url, base_folder, fmt):
+    # Returns (job key, entries, title, folder, entry states). An unfinished
+    # job for the url in output format fmt (audio format or video quality) is
+    # resumed from the journal without extracting the playlist again;
+    # otherwise a new job is started.
+    job_url = normalize_url(playlist_url)
+    job = journal.open_job(kind, job_url, fmt)
+    if job is not None:
+        print(f"Resuming {kind} playlist job: {job['title']}")
+        return job_url, job['entries'], job['title'], job['folder'], journal.entry_states(kind, job_url)
+    info = cached_extract_info(playlist_url, flat=True)
+    entries = [journal_entry(entry) for entry in info.get('entries') or []]
+    playlist_title = info.get('title') or ('Unknown Playlist' if kind == 'audio' else 'unknown')
+    folder = os.path.join(f"{base_folder}", f"{playlist_title}")
+    journal.start_job(kind, job_url, playlist_title, folder, entries, fmt)
+    return job_url, entries, playlist_title, folder, {}
+
+def finished_entry(states, index):
+    # Output path of an entry the journal has as done, if the file is still there
+    state, path = states.get(index, (None, None))
+    if state == DONE and path and os.path.exists(path):
+        return path
+    return None
+
+def job_files(kind, job_url):
+    # Output paths of the entries the journal has as done, in playlist order
+    states = journal.entry_states(kind, job_url)
+    return [states[i][1] for i in sorted(states) if finished_entry(states, i)]
+
+def download_playlist(playlist_url, status_callback=None, progress_callback_audio=None, max_workers=None, pool_callback=None,
+                      tag_callback=None, snapshot_callback=None, job=None, audio_format=None):
     #this function video playlist in audio format with metadata(best for downloading music playlists)
+    # Entries flow through separate stages (resolve, download, ffmpeg), each with its own
+    # workers, and are then handed to the background tagging service, so transcodes and
+    # lyric lookups never hold a download slot. Returns once every track is tagged.
+    # pool_callback(workers, mb_per_second) reports the adaptive download worker count,
+    # tag_callback(file_path, ok) each tagged track. Byte progress and the state of
+    # every entry are coalesced into one status text / snapshot per 0.1 s, keyed by entry index.
+    # Entry states are also kept in the job journal: running the same playlist again
+    # after a crash or cancel skips finished tracks, re-tags tracks that were never
+    # tagged and resumes .part files. Tracks already in the download archive (from any
+    # folder) are linked or copied in instead of being downloaded again.
+    # Downloads and transcodes take network / CPU slots of the global budget for job;
+    # cancelling job stops every stage, kills running transcodes and abandons lyric lookups.
+    # audio_format works as in download_video.
+    # An entry that fails (private or deleted video, failed transcode...) is recorded and
+    # skipped; the rest of the playlist carries on and the failures are listed in the result.
+    # Returns a results.DownloadResult with the finished files, falsy if the playlist failed
+    token = job_token(job)
     try:
-        reset_acancel_flag()
-        
-        ydl_opts_flat = {'quiet': True, 'extract_flat': True}
-        with YoutubeDL(ydl_opts_flat) as ydl:
-            playlist_info = ydl.extract_info(playlist_url, download=False)
-        entries = playlist_info.get('entries', [])
+        fmt = audio_format or AUDIO_FORMAT
+        job_url, entries, playlist_title, download_folder, states = open_playlist_job(
+            'audio', playlist_url, get_default_audio_folder(), fmt)
         total_items = len(entries)
-        playlist_title = playlist_info.get('title', 'Unknown Playlist')
-        download_folder = os.path.join(f"{get_default_audio_folder()}",f"{playlist_title}")
         os.makedirs(download_folder, exist_ok=True)
-
-        def download_single_audio(i, entry):
-            global aCANCEL_FLAG
-            if aCANCEL_FLAG:
-                raise Exception("Audio playlist download cancelled")
+        entry_urls = []
+        limiter = _make_playlist_limiter(max_workers, pool_callback)
+        progress = ProgressAggregator(status_callback, snapshot_callback)
+        archive_before = media_archive.stats()
+        archived_futures = []
+        # Entry index of every tagging future
+        tag_entries = {}
+        failures = {}
+        # The stages below call their work items job too
+        scheduled = job
+
+        def record(i, state, title=None, path=None, entry_url=None):
+            progress.set_state(i, state, title)
+            journal.set_entry('audio', job_url, i, state, entry_url=entry_url, path=path)
+
+        def fail(i, error):
+            # Records a failed entry for the result; the playlist goes on without it
+            entry = entries[i - 1]
+            failures[i] = (entry.get('title') or entry.get('webpage_url') or entry.get('url'), error)
+            record(i, FAILED)
+            print(f"Playlist entry {i} failed: {error}")
+
+        pending, retag = [], []
+        for i, entry in enumerate(entries, start=1):
+            state, path = states.get(i, (None, None))
+            if finished_entry(states, i):
+                progress.set_state(i, DONE, entry.get('title'))
+            elif state == TAGGING and path and os.path.exists(path):
+                retag.append({'index': i, 'entry': entry, 'file': path})
+            else:
+                progress.set_state(i, QUEUED, entry.get('title'))
+                pending.append({'index': i, 'entry': entry})
+        if total_items - len(pending):
+            print(f"Skipping {total_items - len(pending) - len(retag)} finished entries, re-tagging {len(retag)}")
+
+        def tracked(state, func):
+            # Runs a stage for one entry, recording its state. A failed entry is
+            # dropped; only a cancel stops the pipeline.
+            def run(job):
+                token.check("Audio playlist download cancelled")
+                if state:
+                    record(job['index'], state)
+                try:
+                    return func(job)
+                except Exception as e:
+                    error = as_error(e)
+                    if isinstance(error, DownloadCancelled) or token.cancelled:
+                        record(job['index'], FAILED)
+                        raise error
+                    fail(job['index'], error)
+                    return None
+            return run
+
+        def resolve(job):
+            i, entry = job['index'], job['entry']
             video_url = entry.get('webpage_url') or entry.get('url')
             if not video_url:
-                return
-            with YoutubeDL({'quiet': True}) as ydl:
-                video_info = ydl.extract_info(video_url, download=False)
-            title = video_info.get('title', 'Unknown Title')
-            thumbnail = video_info.get('thumbnail', '')
+                fail(i, ExtractionError("Playlist entry has no url"))
+                return None
+            archived = media_archive.lookup(*archive_key(entry), 'audio', fmt)
+            if archived:
+                path = media_archive.place(archived, download_folder)
+                if archived['tagged']:
+                    record(i, DONE, entry.get('title'), path=path, entry_url=video_url)
+                else:
+                    job.update(url=video_url, file=path, info=cached_extract_info(video_url))
+                    archived_futures.append(tag(job))
+                return None
+            entry_urls.append(video_url)
+            video_info = cached_extract_info(video_url)
+            # Queued again until a download slot is free
+            record(i, QUEUED, video_info.get('title'), entry_url=video_url)
             if progress_callback_audio:
-                progress_callback_audio(title, thumbnail, i, total_items, playlist_title)
+                progress_callback_audio(video_info.get('title', 'Unknown Title'), video_info.get('thumbnail', ''),
+                                        i, total_items, playlist_title)
+            return {'index': i, 'url': video_url}
+
+        def download(job):
+            i = job['index']
             ydl_opts = {
                 'format': 'bestaudio/best',
                 'outtmpl': os.path.join(download_folder, '%(title)s.%(ext)s'),
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '320',
-                }],
                 'quiet': True,
                 'writethumbnail': True,
-                'postprocessor_args': [
-                    '-metadata', 'title=%(title)s',
-                    '-metadata', 'artist=%(uploader)s'
-                ],
+                'continuedl': True,
                 'progress_hooks': [
-                    lambda d: aprogress_hook(d, status_callback=status_callback, item_index=i, total_items=total_items)
+                    partial(aprogress_hook, token=token, progress=progress, key=i),
+                    partial(throughput_hook, limiter=limiter, key=i),
                 ],
             }
-            with YoutubeDL(ydl_opts) as ydl:
-                ydl.download([video_url])
-                filename = ydl.prepare_filename(video_info)
-                mp3_file = os.path.splitext(filename)[0] + '.mp3'
-            # Add metadata after download
-            title_for_file = video_info.get('title', 'Unknown Title')
-            #mp3_file = os.path.join(download_folder, f"{title_for_file}.mp3")
-            original_title = video_info.get('title', 'Unknown Title')
-            #raw_title = video_info.get('title', 'Unknown Title')
-            #clean_title = raw_title.split('(')[0].split('|')[0].split('-')[0].strip()
-            metadata = {
-                'title': original_title,
-                'artists': video_info.get('artist') or [video_info.get('uploader', 'Unknown Artist')],
-                'album': video_info.get('album', 'Unknown Album'),
-                'year': str(video_info.get('release_year', video_info.get('upload_date', '')[:4] or 'Unknown Year')),
-                'genre': video_info.get('genre', 'Unknown Genre'),
-                'thumbnail_url': video_info.get('thumbnail', ''),
-            }
-            otl = ""
-            arti=None
-            isFromYoutube = False
-            if "youtube" in video_url or "youtu.be" in video_url:
-             if any(keyword in original_title.lower() for keyword in ["official", "video", "lyric","mashup","audio","-"]):
-           
-              if isinstance(original_title, list):
-                original_title = " ".join(original_title)
-              if '-' in original_title:
-                arti, rest = [part.strip() for part in original_title.split('-', 1)]
-                titl = re.sub(r'(\(.*?\)|\[.*?\])', '', rest).strip()
-                jugad = f"{arti}, {titl}"
-                print(arti,titl,jugad)
-                metadata['title'] = titl
-                otl = original_title
-                if not metadata['artists']:
-
-                  metadata["artists"]=arti
-                isFromYoutube = True
-        
-            print("Final title:", metadata['title'])
-
-
-
-            add_metadata(
-                mp3_file,
-                metadata['title'],
-                metadata['artists'],
-                metadata['album'],
-                metadata['year'],
-                metadata['genre'],
-                metadata['thumbnail_url'],
-                isFromYoutube,
-                otl,
-                arti
-            )
-
-            webp_file = os.path.splitext(filename)[0] + '.webp'
-
-
-           # webp_file = os.path.splitext(mp3_file)[0] + ".webp"
-            if os.path.exists(webp_file):
-                os.remove(webp_file)
-            
-
-        import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            futures = []
-            for i, entry in enumerate(entries, start=1):
-                futures.append(executor.submit(download_single_audio, i, entry))
-            for future in concurrent.futures.as_completed(futures):
-                # This will raise any exception from the worker (including cancellation)
-                future.result()
-        return True
+            with limiter.slot(host_of(job['url'])), scheduler.slot('network', scheduled), YoutubeDL(ydl_opts) as ydl:
+                record(i, DOWNLOADING)
+                job['started'] = time.monotonic()
+                job['info'] = download_url(ydl, job['url'])
+                job['file'] = downloaded_file(ydl, job['info'])
+            return job
+
+        def tag(job):
+            i, path = job['index'], job['file']
+            record(i, TAGGING, path=path)
+            future = tag_audio(path, job['info'], job['url'], fmt, callback=tag_callback, token=token)
+            tag_entries[future] = i
+            future.add_done_callback(lambda f: record(i, FAILED if f.exception() else DONE))
+            return future
+
+        def convert(job):
+            with scheduler.slot('cpu', scheduled):
+                job['file'] = convert_audio(job['file'], job['info'], fmt, token)
+            media_archive.add(*archive_key(job['info']), 'audio', fmt, job['file'], time.monotonic() - job['started'])
+            return tag(job)
+
+        with progress:
+            tag_futures = []
+            for job in retag:
+                job['url'] = job['entry'].get('webpage_url') or job['entry'].get('url')
+                job['info'] = cached_extract_info(job['url'])
+                tag_futures.append(tag(job))
+            pipeline = StagedPipeline([
+                Stage('resolve', tracked(EXTRACTING, resolve), RESOLVE_WORKERS),
+                Stage('download', tracked(None, download), MAX_PLAYLIST_WORKERS),
+                Stage('ffmpeg', tracked(POSTPROCESSING, convert), POSTPROCESS_WORKERS),
+            ])
+            with on_cancel(token, pipeline.stop):
+                tag_futures += pipeline.run(pending)
+            token.check("Audio playlist download cancelled")
+            # A track whose tags couldn't be written is still downloaded; it is
+            # listed with the failures instead of failing the playlist
+            for future in tag_futures + archived_futures:
+                try:
+                    future.result()
+                    # Again here: done callbacks may still be running when result() returns
+                    record(tag_entries[future], DONE)
+                except Exception as e:
+                    error = as_error(e)
+                    if isinstance(error, DownloadCancelled) or token.cancelled:
+                        raise error
+                    fail(tag_entries[future], error)
+        files = job_files('audio', job_url)
+        journal.finish_job('audio', job_url)
+        saved = archive_savings(archive_before)
+        if saved['reused'] and status_callback:
+            status_callback(saved['text'])
+        stats = get_extraction_stats(entry_urls)
+        print(f"Extractions per entry: {stats['per_entry']:.2f} ({stats['extractions']}/{stats['entries']})")
+        if failures and status_callback:
+            status_callback(f"{len(failures)} of {total_items} entries failed")
+        return DownloadResult('audio playlist', playlist_url, files=files, reused=saved['reused'],
+                              failures=[failures[i] for i in sorted(failures)])
     except Exception as e:
-        messagebox.showerror("Playlist Error", f"Failed to download playlist: {str(e)}")
-        return False
+        return failed_result('audio playlist', playlist_url, "Playlist Error", "Failed to download playlist", e)
 
 
-def download_playlist_video(playlist_url, quality="best", status_callback=None, progress_callback=None):
+def download_playlist_video(playlist_url, quality="best", status_callback=None, progress_callback=None, max_workers=None, pool_callback=None,
+                            snapshot_callback=None, job=None):
 #this function downloads video playlist as video(mp4)
+# Every entry's download (and merge) holds a network slot of the global budget for job;
+# cancelling job stops the running downloads on their next progress tick.
+# Returns a results.DownloadResult with the finished files, falsy if the playlist failed
 
+    token = job_token(job)
     try:
-        reset_vcancel_flag()
-        
-        ydl_opts_flat = {'quiet': True, 'extract_flat': True}
-        with YoutubeDL(ydl_opts_flat) as ydl:
-            info = ydl.extract_info(playlist_url, download=False)
-        entries = info.get('entries', [])
+        # Resumed from the job journal like audio playlists
+        job_url, entries, playlist_title, download_folder, states = open_playlist_job(
+            'video', playlist_url, get_default_audio_folder(), quality)
         total_items = len(entries)
-        playlist_title = info.get('title', 'unknown')
         
-        download_folder = os.path.join(f"{get_default_audio_folder()}",f"{playlist_title}")
         os.makedirs(download_folder, exist_ok=True)
         fmt = "bestvideo+bestaudio/best" if quality == "best" else f"bestvideo[height<={quality}]+bestaudio/best[height<={quality}]"
 
+        def record(i, state, title=None, path=None, entry_url=None):
+            progress.set_state(i, state, title)
+            journal.set_entry('video', job_url, i, state, entry_url=entry_url, path=path)
+
         def download_single_video(i, entry):
-            global vCANCEL_FLAG
-            if vCANCEL_FLAG:
-                raise Exception("Video playlist download cancelled")
+            token.check("Video playlist download cancelled")
             video_url = entry.get('webpage_url') or entry.get('url')
             if not video_url:
+                record(i, FAILED)
+                return
+            archived = media_archive.lookup(*archive_key(entry), 'video', quality)
+            if archived:
+                record(i, DONE, path=media_archive.place(archived, download_folder), entry_url=video_url)
                 return
-            with YoutubeDL({'quiet': True}) as ydl:
-                video_info = ydl.extract_info(video_url, download=False)
-            title = video_info.get('title', 'Unknown Title')
-            thumbnail = video_info.get('thumbnail', '')
-            if progress_callback:
-                progress_callback(title, thumbnail, i, total_items, playlist_title)
+            entry_urls.append(video_url)
             ydl_opts = {
                 'format': fmt,
                 'merge_output_format': 'mp4',
                 'outtmpl': os.path.join(download_folder, '%(title)s.%(ext)s'),
                 'quiet': True,
+                'continuedl': True,
                 'progress_hooks': [
-                    partial(vprogress_hook, status_callback=status_callback, item_index=i, total_items=total_items)
+                    partial(vprogress_hook, token=token, progress=progress, key=i),
+                    partial(throughput_hook, limiter=limiter, key=i),
+                ],
+                # Merging the video and audio streams
+                'postprocessor_hooks': [
+                    lambda d: record(i, POSTPROCESSING) if d.get('status') == 'started' else None,
                 ],
             }
-            with YoutubeDL(ydl_opts) as ydl:
-                ydl.download([video_url])
+            try:
+                with limiter.slot(host_of(video_url)), YoutubeDL(ydl_opts) as ydl:
+                    record(i, EXTRACTING, entry_url=video_url)
+                    video_info = cached_extract_info(video_url, ydl)
+                    title = video_info.get('title', 'Unknown Title')
+                    thumbnail = video_info.get('thumbnail', '')
+                    record(i, DOWNLOADING, title)
+                    if progress_callback:
+                        progress_callback(title, thumbnail, i, total_items, playlist_title)
+                    started = time.monotonic()
+                    with scheduler.slot('network', job):
+                        path = downloaded_file(ydl, download_url(ydl, video_url))
+                    media_archive.add(*archive_key(video_info), 'video', quality, path, time.monotonic() - started)
+            except Exception:
+                record(i, FAILED)
+                raise
+            record(i, DONE, path=path)
+        entry_urls = []
+        limiter = _make_playlist_limiter(max_workers, pool_callback)
+        progress = ProgressAggregator(status_callback, snapshot_callback)
+        archive_before = media_archive.stats()
+        pending = []
+        for i, entry in enumerate(entries, start=1):
+            if finished_entry(states, i):
+                progress.set_state(i, DONE, entry.get('title'))
+            else:
+                progress.set_state(i, QUEUED, entry.get('title'))
+                pending.append((i, entry))
+        if len(pending) < total_items:
+            print(f"Skipping {total_items - len(pending)} finished entries")
         import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        # Every entry gets a thread, the limiter decides how many run at once
+        with progress, concurrent.futures.ThreadPoolExecutor(max_workers=MAX_PLAYLIST_WORKERS) as executor:
             futures = []
-            for i, entry in enumerate(entries, start=1):
+            for i, entry in pending:
                 futures.append(executor.submit(download_single_video, i, entry))
             for future in concurrent.futures.as_completed(futures):
                 future.result()
-        return True
+        files = job_files('video', job_url)
+        journal.finish_job('video', job_url)
+        saved = archive_savings(archive_before)
+        if saved['reused'] and status_callback:
+            status_callback(saved['text'])
+        stats = get_extraction_stats(entry_urls)
+        print(f"Extractions per entry: {stats['per_entry']:.2f} ({stats['extractions']}/{stats['entries']})")
+        return DownloadResult('video playlist', playlist_url, files=files, reused=saved['reused'])
     except Exception as e:
-        messagebox.showerror("Playlist Video Download Error", f"Failed to download playlist video: {str(e)}")
-        return False
-
+        return failed_result('video playlist', playlist_url, "Playlist Video Download Error",
+                             "Failed to download playlist video", e)
+
+
+def search_entry(entry):
+    # Flat search hits have no 'thumbnail', only a 'thumbnails' list (or
+    # nothing at all); fill in the fields the search tab shows
+    entry = dict(entry)
+    entry.setdefault('webpage_url', entry.get('url'))
+    entry.setdefault('ie_key', 'Youtube')
+    if not entry.get('thumbnail'):
+        entry['thumbnail'] = entry_thumbnail(entry)
+    return entry
+
+def iter_search(query, max_results=10):
+    # Yields search hits one at a time from a flat extraction, as yt-dlp
+    # pages through the results, instead of fully extracting every video
+    # first. The finished list is cached like any other flat extraction.
+    search_query = f"ytsearch{max_results}:{query}"
+    key = _info_cache_key(search_query, True)
+    cached = info_cache.get(key)
+    if cached is not None:
+        yield from cached.get('entries', [])
+        return
+    entries = []
+    with YoutubeDL({'quiet': True, 'extract_flat': True}) as ydl:
+        result = extract_info(ydl, search_query, process=False)
+        for entry in (result or {}).get('entries') or []:
+            entry = search_entry(YoutubeDL.sanitize_info(entry))
+            entries.append(entry)
+            yield entry
+    info_cache.set(key, {'entries': entries}, INFO_CACHE_TTLS['YoutubeSearch'])
+
+class SearchPager:
+    """
+    Pages through the results of one search on demand. The flat ytsearch
+    extraction is lazy, so next_page() only makes yt-dlp fetch the result
+    pages it hasn't fetched yet. Pages are cached by offset, so the same
+    search run again is served from the cache until it reaches a page that
+    isn't there.
+    """
+
+    def __init__(self, query, page_size=20, limit=500):
+        self.query = query
+        self.page_size = page_size
+        self.limit = limit
+        self.offset = 0
+        self.exhausted = False
+        self._entries = None
+        self._ydl = None
+        self._lock = threading.Lock()
+
+    def _page_key(self):
+        return _info_cache_key(f"ytsearch{self.limit}:{self.query}", True) + f"@{self.offset}:{self.page_size}"
+
+    def next_page(self):
+        with self._lock:
+            if self.exhausted:
+                return []
+            page = None
+            if self._entries is None:
+                cached = info_cache.get(self._page_key())
+                if cached is not None:
+                    page = cached['entries']
+            if page is None:
+                if self._entries is None:
+                    self._ydl = YoutubeDL({'quiet': True, 'extract_flat': True})
+                    result = extract_info(self._ydl, f"ytsearch{self.limit}:{self.query}", process=False)
+                    # Skips what was served from the cache
+                    self._entries = itertools.islice((result or {}).get('entries') or [], self.offset, None)
+                page = [search_entry(YoutubeDL.sanitize_info(entry))
+                        for entry in itertools.islice(self._entries, self.page_size)]
+                info_cache.set(self._page_key(), {'entries': page}, INFO_CACHE_TTLS['YoutubeSearch'])
+            self.offset += len(page)
+            if len(page) < self.page_size or self.offset >= self.limit:
+                self.exhausted = True
+                self.close()
+            return page
+
+    def close(self):
+        if self._ydl is not None:
+            self._ydl.close()
+            self._ydl = None
 
 def search_videos(query, max_results=3):
     # Uses yt-dlp's built-in search capability.
     try:
-        search_query = f"ytsearch{max_results}:{query}"
-        with YoutubeDL({'quiet': True}) as ydl:
-            results = ydl.extract_info(search_query, download=False)
-        return results.get("entries", [])
+        return list(iter_search(query, max_results))
     except Exception as e:
         print(f"Search error: {e}")
         return []
 def get_available_qualities(url):
     try:
-        ydl_opts = {'quiet': True, 'skip_download': True}
-        with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+        info = cached_extract_info(url)
         qualities = set()
         for fmt in info.get("formats", []):
             if fmt.get("vcodec") != "none":
@@ -0,0 +1,79 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Optional HTTP/2 support (pip install "httpx[http2]")
+try:
+    import httpx
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTP2_AVAILABLE = False
+
+# Keep-alive connections kept per host; matched to the number of workers
+# that talk to the same host at once (see downloader.set_playlist_workers)
+POOL_SIZE = 4
+# Hosts with a pool of their own (LRCLib, Genius, lyrics.ovh, thumbnail CDNs...)
+POOL_HOSTS = 16
+RETRIES = 3
+BACKOFF = 0.5
+DEFAULT_TIMEOUT = 10
+USE_HTTP2 = False
+
+_session = None
+_http2_client = None
+_lock = threading.Lock()
+
+
+def configure(pool_size=None, http2=None):
+    """
+    Changes the pool size or switches HTTP/2 on or off. The shared clients are
+    rebuilt on next use; requests already running keep their connection.
+    """
+    global POOL_SIZE, USE_HTTP2, _session, _http2_client
+    with _lock:
+        if pool_size is not None and pool_size != POOL_SIZE:
+            POOL_SIZE = max(1, pool_size)
+            _session, _http2_client = None, None
+        if http2 is not None:
+            if http2 and not HTTP2_AVAILABLE:
+                print("HTTP/2 requested but httpx[http2] is not installed, using HTTP/1.1")
+            USE_HTTP2 = bool(http2) and HTTP2_AVAILABLE
+            _http2_client = None
+
+
+def get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            retry = Retry(total=RETRIES, backoff_factor=BACKOFF, status_forcelist=(429, 500, 502, 503, 504),
+                          allowed_methods=("GET", "HEAD"), respect_retry_after_header=True)
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _get_http2_client():
+    global _http2_client
+    with _lock:
+        if _http2_client is None:
+            limits = httpx.Limits(max_connections=POOL_HOSTS * POOL_SIZE, max_keepalive_connections=POOL_HOSTS * POOL_SIZE)
+            transport = httpx.HTTPTransport(http2=True, retries=RETRIES, limits=limits)
+            _http2_client = httpx.Client(transport=transport, follow_redirects=True)
+        return _http2_client
+
+
+def get(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    GET through the shared keep-alive pool. The response has the usual
+    status_code / json() / text / content / raise_for_status() interface
+    with either backend.
+    """
+    if USE_HTTP2:
+        return _get_http2_client().get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+    return get_session().get(url, params=params, headers=headers, timeout=timeout, **kwargs)
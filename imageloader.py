@@ -0,0 +1,178 @@
+import threading
+from io import BytesIO
+from collections import OrderedDict
+from PIL import Image, ImageQt
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot, Qt, QRectF
+from PySide6.QtGui import QImage, QPixmap, QPainter, QPainterPath, QPen, QColor
+from thumbcache import thumbnail_store
+
+
+def rounded_image(image, radius=20, border_color="#010101", border_width=0):
+    # Same as main.rounded_pixmap but on a QImage, so it can run off the GUI thread
+    rounded = QImage(image.size(), QImage.Format_ARGB32_Premultiplied)
+    rounded.fill(Qt.transparent)
+    painter = QPainter(rounded)
+    painter.setRenderHint(QPainter.Antialiasing)
+    path = QPainterPath()
+    rect = QRectF(0, 0, image.width(), image.height())
+    path.addRoundedRect(rect, radius, radius)
+    painter.setClipPath(path)
+    painter.drawImage(0, 0, image)
+    if border_width > 0:
+        pen = QPen(QColor(border_color))
+        pen.setWidth(border_width)
+        painter.setPen(pen)
+        painter.drawRoundedRect(rect.adjusted(border_width/2, border_width/2, -border_width/2, -border_width/2),
+                                radius, radius)
+    painter.end()
+    return rounded
+
+
+def placeholder_pixmap(width, height, radius=10, color="#303030"):
+    pixmap = QPixmap(width, height)
+    pixmap.fill(Qt.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(QColor(color))
+    painter.drawRoundedRect(QRectF(0, 0, width, height), radius, radius)
+    painter.end()
+    return pixmap
+
+
+def decode_image(data, size, radius=10, border_color="#303030", border_width=2):
+    # Decodes, resizes (LANCZOS) and rounds image bytes into a QImage
+    image = Image.open(BytesIO(data))
+    image = image.convert("RGBA").resize(size, Image.LANCZOS)
+    qt_image = ImageQt.ImageQt(image).copy()
+    return rounded_image(qt_image, radius=radius, border_color=border_color, border_width=border_width)
+
+
+class ImageMemoryCache:
+    """
+    LRU of finished (resized and rounded) QImages, bounded by their total
+    size in bytes rather than by count.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        size = image.sizeInBytes()
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old is not None:
+                self.used_bytes -= old.sizeInBytes()
+            self._images[key] = image
+            self.used_bytes += size
+            while self.used_bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.used_bytes -= evicted.sizeInBytes()
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.used_bytes = 0
+
+
+class _LoadTask(QRunnable):
+    def __init__(self, loader, request_id, key):
+        super().__init__()
+        self.loader = loader
+        self.request_id = request_id
+        self.key = key
+
+    def run(self):
+        url, size, radius, border_color, border_width = self.key
+        try:
+            image = self.loader.memory.get(self.key)
+            if image is None:
+                data = thumbnail_store.get_bytes(url)
+                image = decode_image(data, size, radius, border_color, border_width)
+                self.loader.memory.put(self.key, image)
+            self.loader.image_loaded.emit(self.request_id, image)
+        except Exception as e:
+            self.loader.image_failed.emit(self.request_id, str(e))
+
+
+class ImageLoader(QObject):
+    """
+    Fetches, decodes, resizes and rounds images on a QThreadPool.
+    load() may be called from any thread; the callback always runs on the
+    GUI thread with the finished QPixmap.
+    Finished images are kept in a memory LRU (per url, size and style) and
+    the original bytes in the disk thumbnail store, so an image shown twice
+    is neither downloaded nor resized twice.
+    """
+    image_loaded = Signal(int, QImage)
+    image_failed = Signal(int, str)
+
+    def __init__(self, max_threads=4, memory_bytes=64 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.memory = ImageMemoryCache(memory_bytes)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._callbacks = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.image_loaded.connect(self._deliver)
+        self.image_failed.connect(self._report_failure)
+
+    def load(self, url, callback, size=(480, 270), radius=10, border_color="#303030", border_width=2):
+        key = (url, tuple(size), radius, border_color, border_width)
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._callbacks[request_id] = (url, callback)
+        image = self.memory.get(key)
+        if image is not None:
+            self.image_loaded.emit(request_id, image)
+        else:
+            self.pool.start(_LoadTask(self, request_id, key))
+        return request_id
+
+    def cancel(self, request_id):
+        # The image is still fetched, but the callback won't be called
+        with self._lock:
+            self._callbacks.pop(request_id, None)
+
+    @Slot(int, QImage)
+    def _deliver(self, request_id, image):
+        with self._lock:
+            entry = self._callbacks.pop(request_id, None)
+        if entry is None:
+            return
+        try:
+            entry[1](QPixmap.fromImage(image))
+        except RuntimeError:
+            # The widget waiting for the image was deleted meanwhile
+            pass
+
+    @Slot(int, str)
+    def _report_failure(self, request_id, error):
+        with self._lock:
+            entry = self._callbacks.pop(request_id, None)
+        if entry is not None:
+            print("Thumbnail load error:", entry[0], error)
+
+
+_image_loader = None
+
+
+def get_image_loader():
+    global _image_loader
+    if _image_loader is None:
+        _image_loader = ImageLoader()
+    return _image_loader
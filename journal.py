@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from cache import get_cache_folder
+
+
+class JobJournal:
+    """
+    SQLite journal of playlist jobs. A job stores the playlist's entry list
+    and output folder, and every entry its own state (see
+    progress.ENTRY_STATES) and output path.
+    This lets a job that was interrupted (crash, cancel) be picked up again
+    without extracting the playlist a second time. Entries that are done are
+    skipped, and entries that were downloading resume their .part files
+    because the folder and file names are the same.
+    Jobs are keyed by (kind, url), kind being "audio" or "video", and
+    remember the output format (audio format or video quality) they were
+    started with; a job is only resumed in that format.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_cache_folder(), "jobs.sqlite3")
+        self._lock = threading.Lock()
+        self._db = None
+        try:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "kind TEXT, url TEXT, title TEXT, folder TEXT, entries BLOB, created REAL, updated REAL, "
+                "finished INTEGER DEFAULT 0, PRIMARY KEY (kind, url));"
+                "CREATE TABLE IF NOT EXISTS job_entries ("
+                "kind TEXT, url TEXT, idx INTEGER, entry_url TEXT, state TEXT, path TEXT, error TEXT, updated REAL, "
+                "PRIMARY KEY (kind, url, idx));"
+            )
+            # Journals written before jobs had a format; their jobs never match one
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(jobs)")]
+            if "format" not in columns:
+                self._db.execute("ALTER TABLE jobs ADD COLUMN format TEXT")
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Job journal disabled: {e}")
+            self._db = None
+
+    def _execute(self, sql, params=(), fetch=False):
+        if self._db is None:
+            return [] if fetch else None
+        with self._lock:
+            try:
+                cursor = self._db.execute(sql, params)
+                rows = cursor.fetchall() if fetch else None
+                self._db.commit()
+                return rows
+            except sqlite3.Error as e:
+                print(f"Job journal error: {e}")
+                return [] if fetch else None
+
+    def open_job(self, kind, url, fmt):
+        # The unfinished job for url in format fmt, or None
+        rows = self._execute("SELECT title, folder, entries, format FROM jobs "
+                             "WHERE kind = ? AND url = ? AND finished = 0", (kind, url), fetch=True)
+        if not rows:
+            return None
+        title, folder, entries, job_fmt = rows[0]
+        if job_fmt != fmt:
+            print(f"Unfinished {kind} job for {url} was in format {job_fmt}, starting over in {fmt}")
+            return None
+        try:
+            entries = json.loads(zlib.decompress(entries))
+        except (zlib.error, ValueError):
+            return None
+        return {'title': title, 'folder': folder, 'entries': entries}
+
+    def start_job(self, kind, url, title, folder, entries, fmt):
+        # Starts over: an earlier job for the same url is replaced
+        now = time.time()
+        blob = zlib.compress(json.dumps(entries).encode("utf-8"))
+        self._execute("DELETE FROM job_entries WHERE kind = ? AND url = ?", (kind, url))
+        self._execute("INSERT OR REPLACE INTO jobs (kind, url, title, folder, entries, created, updated, finished, format) "
+                      "VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)", (kind, url, title, folder, blob, now, now, fmt))
+
+    def entry_states(self, kind, url):
+        # {index: (state, path)}
+        rows = self._execute("SELECT idx, state, path FROM job_entries WHERE kind = ? AND url = ?",
+                             (kind, url), fetch=True)
+        return {idx: (state, path) for idx, state, path in rows}
+
+    def set_entry(self, kind, url, index, state, entry_url=None, path=None, error=None):
+        now = time.time()
+        self._execute(
+            "INSERT INTO job_entries (kind, url, idx, entry_url, state, path, error, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (kind, url, idx) DO UPDATE SET "
+            "state = excluded.state, entry_url = COALESCE(excluded.entry_url, entry_url), "
+            "path = COALESCE(excluded.path, path), error = excluded.error, updated = excluded.updated",
+            (kind, url, index, entry_url, state, path, error, now))
+
+    def finish_job(self, kind, url):
+        self._execute("UPDATE jobs SET finished = 1, updated = ? WHERE kind = ? AND url = ?", (time.time(), kind, url))
+
+
+journal = JobJournal()
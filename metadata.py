@@ -1,12 +1,36 @@
-from mutagen.id3 import ID3, APIC, TIT2, TPE1, TALB, TDRC, TCON, USLT, Encoding 
-import requests
+from mutagen.id3 import ID3, ID3NoHeaderError, APIC, TIT2, TPE1, TALB, TDRC, TCON, USLT, Encoding 
+from mutagen.mp4 import MP4, MP4Cover
+from mutagen.oggopus import OggOpus
+from mutagen.oggvorbis import OggVorbis
+from mutagen.flac import FLAC, Picture
+import base64
+import httpclient
+from io import BytesIO
+from PIL import Image
 from urllib.parse import quote
 import os
+import re
+import time
+import threading
+from concurrent.futures import Future, FIRST_COMPLETED, wait
 from bs4 import BeautifulSoup
+from cache import PersistentCache
+from thumbcache import thumbnail_store
+from cancel import on_cancel
+from backends import get_backend
 
 GENIUS_API_KEY = "Your key here"
 LRCLIB_BASE_URL = "https://lrclib.net"  # Public LRCLib instance
 
+# Lyrics cache keyed by (artist, title). Misses are remembered for a shorter
+# time so tracks that get added to LRCLib/Genius later are picked up.
+LYRICS_CACHE_TTL = 30 * 24 * 3600
+LYRICS_MISS_TTL = 24 * 3600
+lyrics_cache = PersistentCache('lyrics', default_ttl=LYRICS_CACHE_TTL, max_memory_entries=512, max_disk_entries=20000)
+
+# Providers are queried in parallel; this bounds the whole lookup for one track
+LYRICS_DEADLINE = 15
+
 def is_valid_lyrics(lyrics, title):
     """
     Checks if the lyrics seem valid.
@@ -31,12 +55,192 @@ def is_valid_lyrics(lyrics, title):
         return False
     return True
 
-def fetch_lyrics(title, artistt=None, isFromYoutube=False):
+def lyrics_cache_key(title, artist=None):
+    # Case, punctuation and spacing differences map to the same entry
+    def norm(text):
+        text = re.sub(r"[^\w\s]", " ", (text or "").casefold())
+        return " ".join(text.split())
+    return f"{norm(artist)}|{norm(title)}"
+
+def lookup_cached_lyrics(title, artist=None):
+    """Returns the cached entry ({'synced', 'plain', 'found'}) for a track, or None."""
+    return lyrics_cache.get(lyrics_cache_key(title, artist))
+
+def lyrics_cache_info():
+    return lyrics_cache.stats()
+
+def purge_lyrics_cache(title=None, artist=None, misses_only=False):
+    """
+    Removes cached lyrics. With title (and artist) only that track is removed,
+    with misses_only only the remembered "not found" results, with no
+    arguments everything. Returns the number of removed entries.
+    """
+    if title is not None:
+        key = lyrics_cache_key(title, artist)
+        found = lyrics_cache.get(key) is not None
+        lyrics_cache.delete(key)
+        return int(found)
+    if misses_only:
+        return lyrics_cache.purge(lambda key, value: not value.get('found'))
+    return lyrics_cache.purge(lambda key, value: True)
+
+def _lrclib_lyrics(title, artist, cancelled):
+    # Returns {'synced', 'plain'} from LRCLib. LRCLib matches on the exact
+    # artist and title, so its answer is trusted without the heuristic.
+    lrclib_url = f"{LRCLIB_BASE_URL}/api/get"
+    params = {"track_name": title, "artist_name": artist}
+    response = httpclient.get(lrclib_url, params=params, timeout=10)
+    if response.status_code == 200:
+        data = response.json()
+        return {'synced': data.get("syncedLyrics"), 'plain': data.get("plainLyrics")}
+    if response.status_code != 404:
+        response.raise_for_status()
+    print(f"LRCLib API returned status {response.status_code} for '{title}' by '{artist}'.")
+    return None
+
+def parse_genius_lyrics(song_page):
+    # Lyrics text of a Genius song page, None if it has none
+    soup = BeautifulSoup(song_page, "html.parser")
+    lyrics_divs = soup.find_all("div", {"data-lyrics-container": "true"})
+    if not lyrics_divs:
+        return None
+    return "\n".join([div.get_text(separator="\n").strip() for div in lyrics_divs])
+
+def _genius_lyrics(title, artist, cancelled):
+    # Genius search followed by a scrape of the song page
+    query = f"{title} {artist}" if artist else title
+    search_query = quote(query)
+    search_url = f"https://api.genius.com/search?q={search_query}"
+    headers = {"Authorization": f"Bearer {GENIUS_API_KEY}"}
+    response = httpclient.get(search_url, headers=headers, timeout=10).json()
+    hits = response.get("response", {}).get("hits", [])
+    if not hits or cancelled.is_set():
+        return None
+    song_url = hits[0]["result"]["url"]
+    song_page = httpclient.get(song_url, timeout=10).text
+    if cancelled.is_set():
+        return None
+    # Parsing the page is the CPU-heavy part; with the process backend it
+    # runs in a worker process (on a thread it would hold the same GIL anyway)
+    backend = get_backend()
+    if backend.name == "process":
+        lyrics = backend.submit(parse_genius_lyrics, song_page).result()
+    else:
+        lyrics = parse_genius_lyrics(song_page)
+    if not lyrics:
+        return None
+    if is_valid_lyrics(lyrics, title):
+        return {'plain': lyrics}
+    print(f"Genius returned invalid or unrelated lyrics for '{title}' by '{artist}'.")
+    return None
+
+def _lyrics_ovh(title, artist, cancelled):
+    alt_url = f"https://api.lyrics.ovh/v1/{artist}/{title}" if artist else f"https://api.lyrics.ovh/v1/{title}"
+    response = httpclient.get(alt_url, timeout=10)
+    if response.status_code == 404:
+        return None
+    lyrics = response.json().get("lyrics", "Lyrics not found")
+    if is_valid_lyrics(lyrics, title):
+        return {'plain': lyrics}
+    return None
+
+# Lyrics providers in order of preference
+LYRICS_PROVIDERS = [
+    ('lrclib', _lrclib_lyrics),
+    ('genius', _genius_lyrics),
+    ('lyrics.ovh', _lyrics_ovh),
+]
+
+def _start_provider(func, title, artist, cancelled):
+    # Runs one provider on a thread of its own and returns its Future. A
+    # provider abandoned by its lookup keeps running until its request
+    # returns, and a shared pool would make later lookups queue behind it.
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run():
+        try:
+            future.set_result(func(title, artist, cancelled))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="lyrics", daemon=True).start()
+    return future
+
+def resolve_lyrics(title, artist=None, deadline=None, token=None):
+    """
+    Queries every lyrics provider at the same time and returns
+    ({'synced', 'plain'}, failed). Plain lyrics are taken from the first
+    provider in LYRICS_PROVIDERS order that has them, synced lyrics only come
+    from LRCLib. As soon as the result can no longer be improved by a provider
+    still running, the rest are abandoned: they stop before their next
+    request. Every provider runs on its own thread, so abandoned ones never
+    delay the next lookup. failed is True when a provider errored or the
+    deadline passed before a result was settled.
+    Cancelling token (cancel.CancelToken) abandons the lookup the same way,
+    at once, and also counts as failed.
+    """
+    cancelled = threading.Event()
+    providers = [(name, func) for name, func in LYRICS_PROVIDERS
+                 if name != 'lrclib' or (artist and artist.lower() != "unknown artist")]
+    futures = {_start_provider(func, title, artist, cancelled): name for name, func in providers}
+    order = [name for name, _ in providers]
+    results = {}
+    failed = False
+    deadline = LYRICS_DEADLINE if deadline is None else deadline
+    end = time.monotonic() + deadline
+    pending = set(futures)
+    # Completed by a cancel so the wait below wakes up
+    stopped = Future()
+
+    def settled():
+        # Plain lyrics are settled once a provider has them and every
+        # provider ranked above it has finished
+        for name in order:
+            if name not in results:
+                return False
+            if results[name] and results[name].get('plain'):
+                return True
+        return True
+
+    with on_cancel(token, lambda: stopped.set_result(None)):
+        while pending and not settled():
+            done, pending = wait(pending | {stopped}, timeout=max(0, end - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            pending.discard(stopped)
+            if stopped in done:
+                print(f"Lyrics lookup for '{title}' cancelled.")
+                failed = True
+                break
+            if not done:
+                print(f"Lyrics lookup for '{title}' hit the {deadline}s deadline.")
+                failed = True
+                break
+            for future in done:
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    print(f"{name} lyrics fetch error: {e}")
+                    results[name] = None
+                    failed = True
+    cancelled.set()
+
+    entry = {'synced': (results.get('lrclib') or {}).get('synced'), 'plain': None}
+    for name in order:
+        if results.get(name) and results[name].get('plain'):
+            entry['plain'] = results[name]['plain']
+            break
+    return entry, failed
+
+def fetch_lyrics(title, artistt=None, isFromYoutube=False, token=None):
     """
-    Attempts to fetch lyrics for a given track using LRCLib as a priority.
-    If an artist is provided and is not "Unknown Artist", it calls the LRCLib API
-    to retrieve lyrics (preferring syncedLyrics). If that fails, or if no valid
-    lyrics are returned, it falls back to fetching from Genius.
+    Fetches lyrics for a given track from all providers in parallel (see
+    resolve_lyrics); LRCLib synced lyrics win, then LRCLib plain, Genius and
+    lyrics.ovh.
+    Results, including misses, are kept in the lyrics cache so a track is only
+    looked up again once its entry expires. A lookup cancelled through token
+    is not cached.
     """
     # Normalize artist: if it's a list or a string with commas, use only the first artist.
     #if artist and artist.lower() != "unknown artist":
@@ -45,124 +249,163 @@ def fetch_lyrics(title, artistt=None, isFromYoutube=False):
     elif isinstance(artistt, str) and "," in artistt:
             artistt = artistt.split(",")[0].strip()
     artist = "; ".join(artistt) if isinstance(artistt, list) else artistt
-    # Try LRCLib if a valid artist is provided
-    if artist and artist.lower() != "unknown artist":
+    key = lyrics_cache_key(title, artist)
+    entry = lyrics_cache.get(key)
+    if entry is None:
+        entry, failed = resolve_lyrics(title, artist, token=token)
+        entry['found'] = bool(entry['synced'] or entry['plain'])
+        # Network errors are not a reason to believe the lyrics don't exist
+        if entry['found'] or not failed:
+            lyrics_cache.set(key, entry, LYRICS_CACHE_TTL if entry['found'] else LYRICS_MISS_TTL)
+    # Prefer synced lyrics if available; otherwise plain lyrics.
+    if entry['synced'] and not isFromYoutube:
+        return entry['synced']
+    return entry['plain']
+
+
+def load_cover(thumbnail_path=None, thumbnail_url=None):
+    """
+    Returns JPEG bytes for the cover art. The thumbnail yt-dlp already wrote
+    next to the track is converted in memory; the url is only fetched (through
+    the shared thumbnail cache) when there is no local file.
+    """
+    if thumbnail_path and os.path.exists(thumbnail_path):
         try:
-            lrclib_url = f"{LRCLIB_BASE_URL}/api/get"
-            params = {"track_name": title, "artist_name": artist}
-            response = requests.get(lrclib_url, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                # Prefer synced lyrics if available; otherwise plain lyrics.
-                if data.get("syncedLyrics") and not isFromYoutube:
-                    return data.get("syncedLyrics")
-                elif data.get("plainLyrics"):
-                    return data.get("plainLyrics")
-            else:
-                print(f"LRCLib API returned status {response.status_code} for '{title}' by '{artist}'.")
+            return _to_jpeg(thumbnail_path)
         except Exception as e:
-            print(f"LRCLib fetch error: {e}")
-    
-    # Fallback: Genius API
+            print(f"Local thumbnail error: {e}")
+    if thumbnail_url:
+        try:
+            return _to_jpeg(BytesIO(thumbnail_store.get_bytes(thumbnail_url)))
+        except Exception as e:
+            print(f"Thumbnail error: {e}")
+    return None
+
+def _to_jpeg(source):
+    with Image.open(source) as image:
+        buffer = BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=92)
+        return buffer.getvalue()
+
+def write_id3_tags(file_path, tags):
     try:
-        query = f"{title} {artist}" if artist else title
-        search_query = quote(query)
-        search_url = f"https://api.genius.com/search?q={search_query}"
-        headers = {"Authorization": f"Bearer {GENIUS_API_KEY}"}
-        response = requests.get(search_url, headers=headers, timeout=10).json()
-        hits = response.get("response", {}).get("hits", [])
-        if not hits:
-            return None
-        song_url = hits[0]["result"]["url"]
-        song_page = requests.get(song_url, timeout=10).text
-        soup = BeautifulSoup(song_page, "html.parser")
-        lyrics_divs = soup.find_all("div", {"data-lyrics-container": "true"})
-        if lyrics_divs:
-            lyrics = "\n".join([div.get_text(separator="\n").strip() for div in lyrics_divs])
-        else:
-            # Fallback to another lyrics API if Genius page parsing fails
-            alt_url = f"https://api.lyrics.ovh/v1/{artist}/{title}" if artist else f"https://api.lyrics.ovh/v1/{title}"
-            response = requests.get(alt_url, timeout=10)
-            lyrics = response.json().get("lyrics", "Lyrics not found")
-        if is_valid_lyrics(lyrics, title):
-            return lyrics
+        audio = ID3(file_path)
+    except ID3NoHeaderError:
+        audio = ID3()
+    audio.delete(file_path)
+    audio.clear()
+    audio.add(TIT2(encoding=Encoding.UTF8, text=tags['title']))
+    audio.add(TPE1(encoding=Encoding.UTF8, text=tags['artist']))
+    if tags['album']:
+        audio.add(TALB(encoding=Encoding.UTF8, text=tags['album']))
+    audio.add(TDRC(encoding=Encoding.UTF8, text=tags['year']))
+    if tags['genre']:
+        audio.add(TCON(encoding=Encoding.UTF8, text=tags['genre']))
+    if tags['lyrics']:
+        audio.add(USLT(encoding=Encoding.UTF8, lang='eng', desc='Lyrics', text=tags['lyrics']))
+    if tags['cover']:
+        audio.add(APIC(encoding=Encoding.UTF8, mime='image/jpeg', type=3, desc='Cover', data=tags['cover']))
+    audio.save(file_path)
+
+def write_mp4_tags(file_path, tags):
+    audio = MP4(file_path)
+    audio.delete()
+    audio['\xa9nam'] = [tags['title']]
+    audio['\xa9ART'] = [tags['artist']]
+    if tags['album']:
+        audio['\xa9alb'] = [tags['album']]
+    audio['\xa9day'] = [tags['year']]
+    if tags['genre']:
+        audio['\xa9gen'] = [tags['genre']]
+    if tags['lyrics']:
+        audio['\xa9lyr'] = [tags['lyrics']]
+    if tags['cover']:
+        audio['covr'] = [MP4Cover(tags['cover'], imageformat=MP4Cover.FORMAT_JPEG)]
+    audio.save()
+
+def write_vorbis_tags(file_path, tags):
+    # Vorbis comments, used by Ogg Opus, Ogg Vorbis and FLAC
+    ext = os.path.splitext(file_path)[1].lower()
+    audio = {'.opus': OggOpus, '.ogg': OggVorbis, '.flac': FLAC}[ext](file_path)
+    audio.delete()
+    audio['title'] = tags['title']
+    audio['artist'] = tags['artist']
+    if tags['album']:
+        audio['album'] = tags['album']
+    audio['date'] = tags['year']
+    if tags['genre']:
+        audio['genre'] = tags['genre']
+    if tags['lyrics']:
+        audio['lyrics'] = tags['lyrics']
+    if tags['cover']:
+        picture = Picture()
+        picture.type = 3
+        picture.mime = 'image/jpeg'
+        picture.desc = 'Cover'
+        picture.data = tags['cover']
+        if isinstance(audio, FLAC):
+            audio.clear_pictures()
+            audio.add_picture(picture)
         else:
-            print(f"Genius returned invalid or unrelated lyrics for '{title}' by '{artist}'.")
-            return None
-    except Exception as e:
-        print(f"Genius fetch error: {e}")
-        return None
+            audio['metadata_block_picture'] = [base64.b64encode(picture.write()).decode('ascii')]
+    audio.save()
 
+# Tag writer for each audio container we produce
+TAG_WRITERS = {
+    '.mp3': write_id3_tags,
+    '.m4a': write_mp4_tags,
+    '.mp4': write_mp4_tags,
+    '.opus': write_vorbis_tags,
+    '.ogg': write_vorbis_tags,
+    '.flac': write_vorbis_tags,
+}
 
-def add_metadata(file_path, title, artists, album, year, genre, thumbnail_url, isFromYoutube,otl,arti):
+def lyrics_query(title, artists, isFromYoutube, arti):
+    # (title, artist) that add_metadata looks the lyrics up with
+    artist_text = "; ".join(artists) if isinstance(artists, list) else artists
+    if artist_text != "Unknown Artist":
+        return title, (arti if isFromYoutube else artists)
+    return title, None
+
+def add_metadata(file_path, title, artists, album, year, genre, thumbnail_url, isFromYoutube,otl,arti, thumbnail_path=None,
+                 token=None):
+    # Errors writing the tags are raised after they are printed, so the
+    # tagging service reports the track as failed and doesn't archive it as tagged
     try:
-        try:
-            audio = ID3(file_path)
-        except Exception:
-            audio = ID3()
-        audio = ID3(file_path)
-        audio.delete()
         artist_text = "; ".join(artists) if isinstance(artists, list) else artists
         print(artist_text)
 
-        if artist_text != "Unknown Artist":
-            if isFromYoutube:
-
-              lyrics = fetch_lyrics(title, arti ,isFromYoutube)
-            else:
-              lyrics = fetch_lyrics(title, artists ,isFromYoutube)
-
-        else:
-            lyrics = fetch_lyrics(title,isFromYoutube)
+        lyrics = fetch_lyrics(*lyrics_query(title, artists, isFromYoutube, arti), isFromYoutube, token=token)
+        if token is not None and token.cancelled:
+            print(f"Tagging cancelled: {title}")
+            return
         if lyrics:
-            audio.add(USLT(
-                encoding=Encoding.UTF8,
-                lang='eng',
-                desc='Lyrics',
-                text=lyrics
-            ))
             print(f"Added lyrics for: {title}")
         else:
             print(f"No valid lyrics found for: {title}")
 
         if isFromYoutube and not lyrics:
-            audio.add(TIT2(encoding=Encoding.UTF8, text=otl))
-            
-            audio.add(TPE1(encoding=Encoding.UTF8, text=artist_text))
+            tag_title, tag_artist = otl, artist_text
         elif isFromYoutube and lyrics:
-            audio.add(TIT2(encoding=Encoding.UTF8, text=title))
-            audio.add(TPE1(encoding=Encoding.UTF8, text=arti))
+            tag_title, tag_artist = title, arti
         else:
-            audio.add(TIT2(encoding=Encoding.UTF8, text=title))
-            audio.add(TPE1(encoding=Encoding.UTF8, text=artist_text))
-            
-            
-
-        if album != "Unknown Album":
-            audio.add(TALB(encoding=Encoding.UTF8, text=album))
-            
-        audio.add(TDRC(encoding=Encoding.UTF8, text=year))
-        if genre != "Unknown Genre":
-            audio.add(TCON(encoding=Encoding.UTF8, text=genre))
-        
-        if thumbnail_url:
-            try:
-                image_data = requests.get(thumbnail_url, timeout=10).content
-                audio.add(APIC(
-                    encoding=Encoding.UTF8,
-                    mime='image/jpeg',
-                    type=3,
-                    desc='Cover',
-                    data=image_data
-                ))
-            except Exception as e:
-                print(f"Thumbnail error: {e}")
-        
-        # Use LRCLib first if artist is known; otherwise, fallback to Genius.
-        
-        audio.save(file_path)
+            tag_title, tag_artist = title, artist_text
+
+        cover = load_cover(thumbnail_path, thumbnail_url)
+
+        tags = {
+            'title': tag_title,
+            'artist': tag_artist,
+            'album': album if album != "Unknown Album" else None,
+            'year': year,
+            'genre': genre if genre != "Unknown Genre" else None,
+            'lyrics': lyrics,
+            'cover': cover,
+        }
+        writer = TAG_WRITERS.get(os.path.splitext(file_path)[1].lower(), write_id3_tags)
+        writer(file_path, tags)
         print(f"Metadata added: {title} - {artist_text}")
     except Exception as e:
         print(title, artists, album, year, genre, file_path, thumbnail_url)
         print(f"Metadata error: {e}")
-
+        raise
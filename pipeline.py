@@ -0,0 +1,98 @@
+import queue
+import threading
+
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, name, func, workers=1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+
+
+class StagedPipeline:
+    """
+    Runs items through a chain of stages. Every stage has its own worker
+    threads and reads from a bounded queue filled by the stage before it,
+    so a slow stage applies back pressure instead of piling up work.
+    A stage function receives the item and returns the item for the next
+    stage, or None to drop it. The first exception stops the pipeline and
+    is re-raised from run(); stop() aborts it from outside.
+    """
+
+    def __init__(self, stages, queue_size=8):
+        self.stages = stages
+        self.queue_size = queue_size
+        self._stop = threading.Event()
+        self._error = None
+        self._lock = threading.Lock()
+
+    def stop(self):
+        self._stop.set()
+
+    def _fail(self, error):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def run(self, items):
+        queues = [queue.Queue(self.queue_size) for _ in self.stages]
+        results = []
+        remaining = [stage.workers for stage in self.stages]
+
+        def put(q, item):
+            # Gives up on a full queue once the pipeline is stopping
+            while True:
+                try:
+                    q.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    if self._stop.is_set() and item is not _DONE:
+                        return False
+
+        def worker(index):
+            stage = self.stages[index]
+            inbox = queues[index]
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                if self._stop.is_set():
+                    continue
+                try:
+                    item = stage.func(item)
+                except BaseException as e:
+                    self._fail(e)
+                    continue
+                if item is None:
+                    continue
+                if index + 1 < len(self.stages):
+                    put(queues[index + 1], item)
+                else:
+                    with self._lock:
+                        results.append(item)
+            with self._lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and index + 1 < len(self.stages):
+                for _ in range(self.stages[index + 1].workers):
+                    put(queues[index + 1], _DONE)
+
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(target=worker, args=(index,), name=f"{stage.name}-{n}", daemon=True)
+                thread.start()
+                threads.append(thread)
+        for item in items:
+            if self._stop.is_set() or not put(queues[0], item):
+                break
+        for _ in range(self.stages[0].workers):
+            put(queues[0], _DONE)
+        for thread in threads:
+            thread.join()
+        if self._error is not None:
+            raise self._error
+        return results
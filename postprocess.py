@@ -0,0 +1,85 @@
+import os
+import shutil
+import subprocess
+from results import PostProcessError, DownloadCancelled
+from cancel import on_cancel
+
+# ffmpeg encoder for each audio codec we can transcode to
+AUDIO_ENCODERS = {
+    "mp3": "libmp3lame",
+}
+
+# Container an audio stream is copied into, by codec, when we only remux.
+# WebM/Matroska can't be tagged, so Opus and Vorbis go into Ogg.
+AUDIO_CONTAINERS = {
+    "opus": "opus",
+    "vorbis": "ogg",
+    "mp4a": "m4a",
+    "aac": "m4a",
+    "alac": "m4a",
+    "mp3": "mp3",
+    "flac": "flac",
+}
+
+
+def get_ffmpeg():
+    return shutil.which("ffmpeg") or "ffmpeg"
+
+
+def run_ffmpeg(args, token=None):
+    # Cancelling token (cancel.CancelToken) kills ffmpeg right away
+    cmd = [get_ffmpeg(), "-y", "-hide_banner", "-loglevel", "error"] + args
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    with on_cancel(token, process.kill):
+        _, stderr = process.communicate()
+    if token is not None and token.cancelled:
+        raise DownloadCancelled("ffmpeg cancelled")
+    if process.returncode != 0:
+        error = stderr.decode("utf-8", "replace").strip().splitlines()
+        raise PostProcessError(f"ffmpeg failed: {error[-1] if error else process.returncode}")
+
+
+def run_ffmpeg_to(temp, target, args, token=None):
+    # Runs ffmpeg writing temp, then moves it to target; a failed or
+    # cancelled run leaves no half-written temp file behind
+    try:
+        run_ffmpeg(args + [temp], token)
+    except Exception:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    os.replace(temp, target)
+
+
+def extract_audio(source, codec="mp3", quality="320", token=None):
+    """
+    Converts a downloaded media file to an audio file next to it and removes
+    the source. Returns the path of the new file.
+    """
+    base = os.path.splitext(source)[0]
+    target = f"{base}.{codec}"
+    temp = f"{base}.temp.{codec}"
+    run_ffmpeg_to(temp, target, ["-i", source, "-vn", "-c:a", AUDIO_ENCODERS[codec], "-b:a", f"{quality}k"], token)
+    if os.path.abspath(source) != os.path.abspath(target):
+        os.remove(source)
+    return target
+
+
+def remux_audio(source, acodec, token=None):
+    """
+    Copies the audio stream of a downloaded file into the container that
+    matches its codec, without re-encoding. Falls back to an MP3 transcode
+    when the codec is unknown. Returns the path of the new file.
+    """
+    codec = (acodec or "").split(".")[0].lower()
+    ext = AUDIO_CONTAINERS.get(codec)
+    if ext is None:
+        print(f"No passthrough container for codec '{acodec}', transcoding to mp3")
+        return extract_audio(source, token=token)
+    base = os.path.splitext(source)[0]
+    target = f"{base}.{ext}"
+    temp = f"{base}.temp.{ext}"
+    run_ffmpeg_to(temp, target, ["-i", source, "-vn", "-map_metadata", "-1", "-c:a", "copy"], token)
+    if os.path.abspath(source) != os.path.abspath(target):
+        os.remove(source)
+    return target
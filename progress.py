@@ -0,0 +1,176 @@
+import threading
+import time
+
+# How often snapshots are published, in seconds (10 Hz)
+PUBLISH_INTERVAL = 0.1
+
+# States of a playlist entry, in the order it goes through them
+QUEUED = "queued"
+EXTRACTING = "extracting"
+DOWNLOADING = "downloading"
+POSTPROCESSING = "post-processing"
+TAGGING = "tagging"
+DONE = "done"
+FAILED = "failed"
+ENTRY_STATES = (QUEUED, EXTRACTING, DOWNLOADING, POSTPROCESSING, TAGGING, DONE, FAILED)
+
+
+def format_bytes(num_bytes):
+    return f"{(num_bytes or 0) / 1024 / 1024:.2f} MB"
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def format_snapshot(snapshot):
+    # One status line for the whole snapshot
+    if snapshot['items'] and snapshot['active'] == 0 and snapshot['finished'] == len(snapshot['items']):
+        if len(snapshot['items']) == 1:
+            return "Download finished."
+        return f"Finished downloading {snapshot['finished']} items ({format_bytes(snapshot['downloaded_bytes'])})."
+    text = f"Downloaded {format_bytes(snapshot['downloaded_bytes'])}"
+    if snapshot['total_bytes']:
+        text += f" / {format_bytes(snapshot['total_bytes'])}"
+    if len(snapshot['items']) > 1:
+        text += f" across {snapshot['active']} downloads"
+    if snapshot['speed']:
+        text += f" ({format_bytes(snapshot['speed'])}/s, ETA {format_eta(snapshot['eta'])})"
+    return text
+
+
+class ProgressAggregator:
+    """
+    Collects yt-dlp progress ticks from any number of download threads and
+    publishes one coalesced snapshot at a fixed rate, instead of one UI
+    update per tick.
+    A tick only replaces the latest values stored for its item and file (a
+    single dict assignment, so the download threads never take a lock);
+    a publisher thread sums them up every `interval` seconds and calls
+    status_callback(text) and snapshot_callback(snapshot) when something
+    changed.
+
+    Playlists also report where each entry is with set_state().
+
+    A snapshot is a dict with per-item values under 'items' (keyed by the
+    key given to update()/set_state(): state, title, downloaded_bytes,
+    total_bytes, speed, eta, status) and the aggregate downloaded_bytes,
+    total_bytes, speed, eta, active and finished download counts, the
+    number of entries per state under 'states' and items_per_minute.
+    """
+
+    def __init__(self, status_callback=None, snapshot_callback=None, interval=PUBLISH_INTERVAL):
+        self.status_callback = status_callback
+        self.snapshot_callback = snapshot_callback
+        self.interval = interval
+        self._items = {}
+        self._states = {}
+        self._titles = {}
+        self._started = time.monotonic()
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        if self._thread is None:
+            self._started = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name="progress", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        # Publishes whatever arrived since the last snapshot
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._dirty:
+            self.publish()
+
+    def update(self, key, d):
+        # Items downloaded as several files (video + audio) keep one entry
+        # per file so the second file doesn't reset the first one's bytes
+        files = self._items.get(key)
+        if files is None:
+            files = self._items.setdefault(key, {})
+        files[d.get('filename') or d.get('tmpfilename')] = (
+            d.get('status'),
+            d.get('downloaded_bytes') or 0,
+            d.get('total_bytes') or d.get('total_bytes_estimate') or 0,
+            d.get('speed') or 0,
+        )
+        self._dirty = True
+
+    def set_state(self, key, state, title=None):
+        self._states[key] = state
+        if title:
+            self._titles[key] = title
+        self._dirty = True
+
+    def snapshot(self):
+        items = {}
+        keys = list(self._states)
+        keys += [key for key in list(self._items) if key not in self._states]
+        for key in keys:
+            ticks = list(self._items.get(key, {}).values())
+            downloading = [tick for tick in ticks if tick[0] == 'downloading']
+            downloaded = sum(tick[1] if tick[0] != 'finished' else max(tick[1], tick[2]) for tick in ticks)
+            total = sum(max(tick[1], tick[2]) for tick in ticks)
+            speed = sum(tick[3] for tick in downloading)
+            items[key] = {
+                'state': self._states.get(key),
+                'title': self._titles.get(key),
+                'status': 'downloading' if downloading else (ticks[-1][0] if ticks else None),
+                'downloaded_bytes': downloaded,
+                'total_bytes': total,
+                'speed': speed,
+                'eta': (total - downloaded) / speed if speed and total else None,
+            }
+        downloaded = sum(item['downloaded_bytes'] for item in items.values())
+        total = sum(item['total_bytes'] for item in items.values())
+        speed = sum(item['speed'] for item in items.values())
+        states = dict.fromkeys(ENTRY_STATES, 0)
+        for item in items.values():
+            if item['state'] in states:
+                states[item['state']] += 1
+        minutes = (time.monotonic() - self._started) / 60
+        return {
+            'items': items,
+            'downloaded_bytes': downloaded,
+            'total_bytes': total,
+            'speed': speed,
+            'eta': (total - downloaded) / speed if speed and total else None,
+            'active': sum(1 for item in items.values() if item['status'] == 'downloading'),
+            'finished': sum(1 for item in items.values() if item['status'] == 'finished'),
+            'states': states,
+            # Not meaningful during the first seconds
+            'items_per_minute': states[DONE] / minutes if minutes * 60 >= 5 else 0.0,
+        }
+
+    def publish(self):
+        self._dirty = False
+        snapshot = self.snapshot()
+        try:
+            if self.snapshot_callback:
+                self.snapshot_callback(snapshot)
+            if self.status_callback:
+                self.status_callback(format_snapshot(snapshot))
+        except Exception as e:
+            print(f"Progress callback error: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self._dirty:
+                self.publish()
@@ -0,0 +1,92 @@
+class DownloaderError(Exception):
+    """Base class of the errors the download engine raises."""
+    title = "Download Error"
+
+
+class ExtractionError(DownloaderError):
+    """A url could not be resolved to an info dict."""
+    title = "Extraction Error"
+
+
+class DownloadFailed(DownloaderError):
+    """The media itself could not be downloaded."""
+
+
+class PostProcessError(DownloaderError):
+    """ffmpeg failed to convert, remux or merge a downloaded file."""
+    title = "Post-processing Error"
+
+
+class DownloadCancelled(DownloaderError):
+    """The user cancelled the download."""
+    title = "Download Cancelled"
+
+
+def as_error(e, default=DownloadFailed):
+    # The typed error for any exception a download raised. yt-dlp wraps
+    # exceptions raised in our hooks in its own DownloadError (exc_info).
+    if isinstance(e, DownloaderError):
+        return e
+    cause = (getattr(e, 'exc_info', None) or (None, None))[1]
+    if isinstance(cause, DownloaderError):
+        return cause
+    error = default(str(e))
+    error.__cause__ = e
+    return error
+
+
+class DownloadResult:
+    """
+    What the download functions return instead of True/False. It is truthy
+    when the download succeeded, so `if result:` keeps working.
+    kind is "audio", "video", "audio playlist" or "video playlist"; files
+    are the output paths, reused how many of them came from the download
+    archive. A failed download has its DownloaderError in error, and a
+    title and message for showing it.
+    A playlist succeeds even when some of its entries fail; failures lists
+    those as (entry title or url, DownloaderError) pairs.
+    """
+
+    def __init__(self, kind, url, files=None, reused=0, error=None, error_title=None, message=None, failures=None):
+        self.kind = kind
+        self.url = url
+        self.files = list(files or [])
+        self.reused = reused
+        self.failures = list(failures or [])
+        self.error = error
+        self.error_title = error_title or (error.title if error is not None else None)
+        self.message = message or (str(error) if error is not None else None)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def cancelled(self):
+        return isinstance(self.error, DownloadCancelled)
+
+    def __bool__(self):
+        return self.ok
+
+    def raise_for_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'url': self.url,
+            'ok': self.ok,
+            'files': self.files,
+            'reused': self.reused,
+            'error': type(self.error).__name__ if self.error is not None else None,
+            'cancelled': self.cancelled,
+            'message': self.message,
+            'failures': [{'entry': entry, 'error': type(error).__name__, 'message': str(error)}
+                         for entry, error in self.failures],
+        }
+
+    def __repr__(self):
+        if self.ok:
+            return f"<DownloadResult {self.kind} ok files={len(self.files)} failures={len(self.failures)}>"
+        return f"<DownloadResult {self.kind} {type(self.error).__name__}: {self.message}>"
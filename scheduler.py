@@ -0,0 +1,271 @@
+import os
+import itertools
+import threading
+from contextlib import contextmanager
+from cancel import CancelToken
+from results import DownloadCancelled
+
+# Lower runs first: single items go ahead of bulk playlists
+PRIORITY_SINGLE = 0
+PRIORITY_PLAYLIST = 10
+
+# Global budget shared by every job
+NETWORK_SLOTS = 8
+CPU_SLOTS = os.cpu_count() or 2
+MAX_RUNNING_JOBS = 4
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED = "finished"
+
+_job_ids = itertools.count(1)
+
+
+class Job:
+    """
+    One submitted download. func(job) runs on its own thread once the job
+    is started; the download functions take the job and hold its
+    network_slot() while transferring media and its cpu_slot() while ffmpeg
+    runs. A paused job is not started, and a running one gets no new slots
+    until it is resumed (what it is transferring right now still finishes).
+    Every job has its own CancelToken; cancel() stops only this job.
+    """
+
+    def __init__(self, scheduler, func, title, priority, position):
+        self.id = next(_job_ids)
+        self.scheduler = scheduler
+        self.func = func
+        self.title = title
+        self.priority = priority
+        self.position = position
+        self.paused = False
+        self.state = QUEUED
+        self.held = {'network': 0, 'cpu': 0}
+        self.result = None
+        self.error = None
+        self.token = CancelToken()
+        self._done = threading.Event()
+
+    def network_slot(self):
+        return self.scheduler.slot('network', self)
+
+    def cpu_slot(self):
+        return self.scheduler.slot('cpu', self)
+
+    def pause(self):
+        self.scheduler.pause(self)
+
+    def resume(self):
+        self.scheduler.resume(self)
+
+    def cancel(self):
+        self.scheduler.cancel(self)
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        # The job's return value, None if it hasn't finished in time or raised
+        self._done.wait(timeout)
+        return self.result
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.title!r} {self.state}{' paused' if self.paused else ''}>"
+
+
+class Scheduler:
+    """
+    Central queue for every download the app starts, with one budget of
+    network slots (media transfers) and CPU slots (ffmpeg) shared by all of
+    them.
+    At most `max_jobs` jobs run at a time; queued jobs start in (priority,
+    position) order. Single items are started right away even when
+    `max_jobs` are already running, since running playlists would otherwise
+    keep them queued until one finishes; they still wait for slots of the
+    budget, which they are served first. Free slots go to the waiting request of the job with
+    the best priority, then to the job holding the fewest slots of that
+    kind, so parallel playlists share the budget evenly, then in queue order.
+    Jobs can be paused, resumed, moved in the queue and cancelled; a
+    cancelled job waiting for a slot gives up at once.
+    Listeners are called with no arguments, from any thread, whenever the
+    job list changes.
+    """
+
+    def __init__(self, network_slots=NETWORK_SLOTS, cpu_slots=CPU_SLOTS, max_jobs=MAX_RUNNING_JOBS):
+        self.capacity = {'network': max(1, network_slots), 'cpu': max(1, cpu_slots)}
+        self.max_jobs = max(1, max_jobs)
+        self.listeners = []
+        self._in_use = {'network': 0, 'cpu': 0}
+        self._waiters = {'network': [], 'cpu': []}  # [job, sequence, granted]
+        self._jobs = []
+        self._positions = itertools.count()
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def configure(self, network_slots=None, cpu_slots=None, max_jobs=None):
+        with self._cond:
+            if network_slots:
+                self.capacity['network'] = max(1, int(network_slots))
+            if cpu_slots:
+                self.capacity['cpu'] = max(1, int(cpu_slots))
+            if max_jobs:
+                self.max_jobs = max(1, int(max_jobs))
+            self._dispatch()
+
+    def submit(self, func, title="", priority=PRIORITY_PLAYLIST):
+        with self._cond:
+            job = Job(self, func, title, priority, next(self._positions))
+            self._jobs.append(job)
+            self._dispatch()
+        self._changed()
+        return job
+
+    def jobs(self):
+        # Unfinished jobs in the order they are served
+        with self._cond:
+            return sorted(self._jobs, key=self._order)
+
+    def pause(self, job):
+        with self._cond:
+            job.paused = True
+        self._changed()
+
+    def resume(self, job):
+        with self._cond:
+            job.paused = False
+            self._dispatch()
+        self._changed()
+
+    def cancel(self, job):
+        # A queued job is dropped without running, a running one stops
+        # wherever its token is checked or interrupts it
+        job.token.cancel()
+        with self._cond:
+            dropped = job.state == QUEUED
+            if dropped:
+                job.state = FINISHED
+                job.error = DownloadCancelled(f"{job.title} cancelled before it started")
+                self._jobs.remove(job)
+            self._cond.notify_all()
+        if dropped:
+            job._done.set()
+        self._changed()
+
+    def move(self, job, index):
+        # Puts job at index of jobs() among the jobs of the same priority
+        with self._cond:
+            if job not in self._jobs:
+                return
+            peers = [other for other in sorted(self._jobs, key=self._order)
+                     if other.priority == job.priority and other is not job]
+            peers.insert(max(0, min(index, len(peers))), job)
+            positions = sorted(other.position for other in peers)
+            for other, position in zip(peers, positions):
+                other.position = position
+            self._dispatch()
+        self._changed()
+
+    def set_priority(self, job, priority):
+        with self._cond:
+            job.priority = priority
+            self._dispatch()
+        self._changed()
+
+    @contextmanager
+    def slot(self, kind, job=None):
+        # Blocks until the budget has a free slot of kind ('network' or
+        # 'cpu') for job. Calls without a job (e.g. from cli.py) are served
+        # like single items. Raises results.DownloadCancelled if the job is
+        # cancelled while it waits.
+        waiter = [job, next(self._sequence), False]
+        with self._cond:
+            self._waiters[kind].append(waiter)
+            self._grant(kind)
+            while not waiter[2]:
+                if job is not None and job.token.cancelled:
+                    self._waiters[kind].remove(waiter)
+                    raise DownloadCancelled(f"{job.title} cancelled")
+                self._cond.wait()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_use[kind] -= 1
+                if job is not None:
+                    job.held[kind] -= 1
+                self._grant(kind)
+
+    def usage(self):
+        with self._cond:
+            return {kind: (self._in_use[kind], self.capacity[kind]) for kind in self.capacity}
+
+    def _order(self, job):
+        return job.priority, job.position
+
+    def _rank(self, waiter, kind):
+        job = waiter[0]
+        if job is None:
+            return PRIORITY_SINGLE, 0, -1, waiter[1]
+        return job.priority, job.held[kind], job.position, waiter[1]
+
+    def _grant(self, kind):
+        # Caller holds self._cond
+        waiters = self._waiters[kind]
+        granted = False
+        while self._in_use[kind] < self.capacity[kind]:
+            ready = [waiter for waiter in waiters
+                     if waiter[0] is None or not (waiter[0].paused or waiter[0].token.cancelled)]
+            if not ready:
+                break
+            waiter = min(ready, key=lambda waiter: self._rank(waiter, kind))
+            waiters.remove(waiter)
+            waiter[2] = True
+            self._in_use[kind] += 1
+            if waiter[0] is not None:
+                waiter[0].held[kind] += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _dispatch(self):
+        # Caller holds self._cond
+        running = sum(1 for job in self._jobs if job.state == RUNNING)
+        for job in sorted(self._jobs, key=self._order):
+            if running >= self.max_jobs and job.priority > PRIORITY_SINGLE:
+                break
+            if job.state == QUEUED and not job.paused:
+                job.state = RUNNING
+                running += 1
+                threading.Thread(target=self._run, args=(job,), name=f"job-{job.id}", daemon=True).start()
+        for kind in self.capacity:
+            self._grant(kind)
+
+    def _run(self, job):
+        self._changed()
+        try:
+            job.result = job.func(job)
+        except Exception as e:
+            job.error = e
+            print(f"Job {job.title} failed: {e}")
+        finally:
+            with self._cond:
+                job.state = FINISHED
+                self._jobs.remove(job)
+                self._dispatch()
+            job._done.set()
+            self._changed()
+
+    def _changed(self):
+        for listener in list(self.listeners):
+            try:
+                listener()
+            except Exception as e:
+                print(f"Scheduler listener error: {e}")
+
+
+scheduler = Scheduler()
@@ -0,0 +1,184 @@
+import os
+import re
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError
+from metadata import add_metadata, fetch_lyrics, lyrics_query
+from backends import get_backend
+from results import DownloadCancelled
+
+
+def track_metadata(info, url):
+    # Tag values for a downloaded track. YouTube titles like "Artist - Title (Official Video)"
+    # are split into artist and title so the lyric lookup has a chance.
+    original_title = info.get('title', 'Unknown Title')
+    metadata = {
+        'title': original_title,
+        'artists': info.get('artist') or [info.get('uploader', 'Unknown Artist')],
+        'album': info.get('album', 'Unknown Album'),
+        'year': str(info.get('release_year', (info.get('upload_date') or '')[:4] or 'Unknown Year')),
+        'genre': info.get('genre', 'Unknown Genre'),
+        'thumbnail_url': info.get('thumbnail', ''),
+        'isFromYoutube': False,
+        'otl': "",
+        'arti': None,
+    }
+    if "youtube" in url or "youtu.be" in url:
+     if any(keyword in original_title.lower() for keyword in ["official", "video", "lyric","mashup","audio","-"]):
+       if isinstance(original_title, list):
+          original_title = " ".join(original_title)
+       if '-' in original_title:
+         arti, rest = [part.strip() for part in original_title.split('-', 1)]
+         titl = re.sub(r'(\(.*?\)|\[.*?\])', '', rest).strip()
+         metadata['title'] = titl
+         metadata['otl'] = original_title
+         metadata['arti'] = arti
+         if not metadata['artists']:
+          metadata["artists"]=arti
+         metadata['isFromYoutube'] = True
+    return metadata
+
+def written_thumbnails(info):
+    # Thumbnail files yt-dlp wrote for this track (writethumbnail) that still exist
+    return [thumbnail['filepath'] for thumbnail in info.get('thumbnails') or []
+            if thumbnail.get('filepath') and os.path.exists(thumbnail['filepath'])]
+
+def local_thumbnail(file_path, info):
+    # Thumbnail yt-dlp wrote for this track, else an image named like the track
+    written = written_thumbnails(info)
+    if written:
+        return written[-1]
+    base = os.path.splitext(file_path)[0]
+    for ext in ('.webp', '.jpg', '.png'):
+        if os.path.exists(base + ext):
+            return base + ext
+    return None
+
+def tag_track(file_path, info, url, token=None):
+    # Writes tags, cover art and lyrics, then removes the thumbnails yt-dlp left behind
+    # (never an image that only happens to be named like the track).
+    # Raises results.DownloadCancelled if token is cancelled before the tags are written
+    metadata = track_metadata(info, url)
+    print("Final title:", metadata['title'])
+    thumbnail_path = local_thumbnail(file_path, info)
+    add_metadata(
+        file_path,
+        metadata['title'],
+        metadata['artists'],
+        metadata['album'],
+        metadata['year'],
+        metadata['genre'],
+        metadata['thumbnail_url'],
+        metadata['isFromYoutube'],
+        metadata['otl'],
+        metadata['arti'],
+        thumbnail_path=thumbnail_path,
+        token=token
+    )
+    if token is not None:
+        token.check("Tagging cancelled")
+    for path in written_thumbnails(info):
+        os.remove(path)
+
+
+class TaggingService:
+    """
+    Writes tags off the download threads. submit() queues a (file, info) job
+    and returns a Future right away. A background thread collects jobs into
+    batches (up to batch_size, or whatever arrived within batch_wait seconds),
+    looks up the lyrics of the whole batch concurrently with duplicates
+    resolved once, then writes the tags of the batch in parallel on the
+    execution backend (see backends). callback(file_path, ok) is called
+    when a job is done. A job whose token (cancel.CancelToken) is cancelled
+    is skipped, or its lyrics lookup abandoned, and its Future fails with
+    results.DownloadCancelled.
+    """
+
+    def __init__(self, batch_size=8, batch_wait=0.5, lookup_workers=4):
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.lookup_workers = lookup_workers
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="tagging", daemon=True)
+                self._thread.start()
+
+    def join(self):
+        # Blocks until every job submitted so far is done
+        self._queue.join()
+
+    def submit(self, file_path, info, url, callback=None, token=None):
+        future = Future()
+        self._queue.put((file_path, info, url, callback, future, token))
+        self._ensure_started()
+        return future
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        end = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get(timeout=max(0, end - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _prefetch_lyrics(self, batch):
+        # Warms the lyrics cache for the batch so tagging itself never waits on a provider
+        queries = {}
+        for file_path, info, url, callback, future, token in batch:
+            if token is not None and token.cancelled:
+                continue
+            metadata = track_metadata(info, url)
+            title, artist = lyrics_query(metadata['title'], metadata['artists'], metadata['isFromYoutube'], metadata['arti'])
+            queries.setdefault((title, str(artist)), [title, artist, []])[2].append(token)
+        # A lookup is only abandoned on cancel when a single job is waiting for it
+        lookups = [(title, artist, tokens[0] if len(set(map(id, tokens))) == 1 else None)
+                   for title, artist, tokens in queries.values()]
+        with ThreadPoolExecutor(max_workers=self.lookup_workers) as executor:
+            list(executor.map(lambda lookup: fetch_lyrics(lookup[0], lookup[1], token=lookup[2]), lookups))
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._prefetch_lyrics(batch)
+            except Exception as e:
+                print(f"Lyrics prefetch error: {e}")
+            work = []
+            for file_path, info, url, callback, future, token in batch:
+                try:
+                    if token is not None:
+                        token.check("Tagging cancelled")
+                    work.append(get_backend().submit(tag_track, file_path, info, url, token=token))
+                except Exception as e:
+                    work.append(e)
+            for (file_path, info, url, callback, future, token), result in zip(batch, work):
+                ok = True
+                try:
+                    if isinstance(result, Exception):
+                        raise result
+                    try:
+                        result.result()
+                    except CancelledError:
+                        raise DownloadCancelled("Tagging cancelled")
+                    future.set_result(file_path)
+                except Exception as e:
+                    ok = False
+                    print(f"Tagging error for {file_path}: {e}")
+                    future.set_exception(e)
+                if callback:
+                    try:
+                        callback(file_path, ok)
+                    except Exception as e:
+                        print(f"Tagging callback error: {e}")
+                self._queue.task_done()
+
+
+tagging_service = TaggingService()
@@ -0,0 +1,52 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import Scheduler, PRIORITY_SINGLE, PRIORITY_PLAYLIST, QUEUED, RUNNING
+
+
+class SchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = Scheduler(network_slots=2, cpu_slots=1, max_jobs=2)
+        self.stop = threading.Event()
+
+    def tearDown(self):
+        self.stop.set()
+        for job in self.scheduler.jobs():
+            job.wait(5)
+
+    def playlist(self, job):
+        # Loops over entries, taking a network slot for each one
+        while not self.stop.is_set():
+            with job.network_slot():
+                self.stop.wait(0.01)
+
+    def test_single_starts_while_playlists_fill_job_cap(self):
+        playlists = [self.scheduler.submit(self.playlist, f"playlist {n}", PRIORITY_PLAYLIST) for n in range(2)]
+        transferred = threading.Event()
+
+        def single(job):
+            with job.network_slot():
+                transferred.set()
+
+        job = self.scheduler.submit(single, "single", PRIORITY_SINGLE)
+        self.assertTrue(transferred.wait(2), job)
+        self.assertTrue(job.wait(2) is None and job.done())
+        self.assertTrue(all(playlist.state == RUNNING for playlist in playlists))
+
+    def test_playlist_waits_for_job_cap(self):
+        for n in range(2):
+            self.scheduler.submit(self.playlist, f"playlist {n}", PRIORITY_PLAYLIST)
+        queued = self.scheduler.submit(self.playlist, "playlist 2", PRIORITY_PLAYLIST)
+        self.assertEqual(queued.state, QUEUED)
+        self.stop.set()
+        queued.wait(2)
+        self.assertTrue(queued.done())
+
+
+if __name__ == "__main__":
+    unittest.main()
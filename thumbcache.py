@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import httpclient
+from cache import get_cache_folder
+
+
+class ThumbnailStore:
+    """
+    Disk cache of original image bytes keyed by url.
+    An image younger than `fresh_for` seconds is served straight from disk;
+    older ones are revalidated with If-None-Match / If-Modified-Since and
+    only downloaded again when the server says they changed. If the server
+    can't be reached the stale copy is used. The folder is kept under
+    `max_bytes` by dropping the least recently used images.
+    """
+
+    def __init__(self, folder=None, fresh_for=24 * 3600, max_bytes=200 * 1024 * 1024):
+        self.folder = folder or os.path.join(get_cache_folder(), "thumbnails")
+        self.fresh_for = fresh_for
+        self.max_bytes = max_bytes
+        os.makedirs(self.folder, exist_ok=True)
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._size = None
+
+    def _paths(self, url):
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.folder, name)
+        return base + ".img", base + ".json"
+
+    def _url_lock(self, url):
+        # One download per url at a time, concurrent callers wait for it
+        with self._locks_lock:
+            return self._locks.setdefault(url, threading.Lock())
+
+    def get_bytes(self, url, timeout=10):
+        data_path, meta_path = self._paths(url)
+        with self._url_lock(url):
+            meta, data = None, None
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                with open(data_path, "rb") as f:
+                    data = f.read()
+            except (OSError, ValueError):
+                meta, data = None, None
+            if data is not None and time.time() - meta.get("checked", 0) < self.fresh_for:
+                os.utime(data_path)
+                return data
+
+            headers = {}
+            if data is not None:
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+            try:
+                response = httpclient.get(url, headers=headers, timeout=timeout)
+            except Exception:
+                if data is not None:
+                    return data
+                raise
+            if response.status_code == 304 and data is not None:
+                meta["checked"] = time.time()
+                self._write_meta(meta_path, meta)
+                os.utime(data_path)
+                return data
+            response.raise_for_status()
+            data = response.content
+            meta = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "checked": time.time(),
+            }
+            try:
+                with open(data_path, "wb") as f:
+                    f.write(data)
+                self._write_meta(meta_path, meta)
+                self._trim(len(data))
+            except OSError as e:
+                print(f"Thumbnail cache write error: {e}")
+            return data
+
+    def _write_meta(self, meta_path, meta):
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _trim(self, added):
+        with self._locks_lock:
+            if self._size is not None:
+                self._size += added
+                if self._size <= self.max_bytes:
+                    return
+            files = []
+            for name in os.listdir(self.folder):
+                if name.endswith(".img"):
+                    path = os.path.join(self.folder, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                for victim in (path, path[:-4] + ".json"):
+                    try:
+                        os.remove(victim)
+                    except OSError:
+                        pass
+                total -= size
+            self._size = total
+
+    def clear(self):
+        with self._locks_lock:
+            for name in os.listdir(self.folder):
+                try:
+                    os.remove(os.path.join(self.folder, name))
+                except OSError:
+                    pass
+            self._size = 0
+
+
+thumbnail_store = ThumbnailStore()